@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""Load test of the organizer server: a pool of local client processes sends
+a mix of lookups and modifications over keep-alive connections, reporting
+throughput and the latency of each request type"""
+
+import argparse
+import http.client
+import json
+import multiprocessing
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from urllib.parse import quote
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import settings as conf  # noqa: E402
+import suite  # noqa: E402
+
+PERCENTILES = [50, 90, 99]
+
+
+def request(connection, method, path, body=None):
+    """Send a request, return status and decoded result"""
+    data = None if body is None else json.dumps(body)
+    connection.request(method, path, data, {"Content-Type": "application/json"})
+    response = connection.getresponse()
+    return response.status, json.loads(response.read())
+
+
+def client(args, num, drawers):
+    """Send requests for the given duration, return the latencies by request
+    type and the amount of failed requests, modifies only every clients-th
+    drawer so no other client changes the item indices it relies on"""
+    rng = random.Random(num)
+    connection = http.client.HTTPConnection(args.host, args.port)
+    latencies = {}
+    errors = 0
+    own = range(num, drawers, args.clients)
+    end = time.perf_counter() + args.duration
+    while time.perf_counter() < end:
+        if rng.random() < args.writes:
+            # add an item and remove it again
+            drawer = rng.choice(own)
+            requests = [
+                ("add", "POST", f"/drawers/{drawer}/items", {"name": f"load {num}"}),
+                ("rm", "DELETE", f"/drawers/{drawer}/items/{{item}}", None),
+            ]
+        elif rng.random() < 0.5:
+            query = quote(rng.choice(suite.QUERIES))
+            requests = [("find", "GET", f"/find?q={query}", None)]
+        else:
+            drawer = rng.randrange(drawers)
+            requests = [("ls", "GET", f"/drawers/{drawer}", None)]
+        result = {}
+        for name, method, path, body in requests:
+            start = time.perf_counter()
+            status, result = request(connection, method, path.format(**result), body)
+            latencies.setdefault(name, []).append(time.perf_counter() - start)
+            if status != 200:
+                errors += 1
+                break
+    connection.close()
+    return latencies, errors
+
+
+def wait_for_server(args, process, timeout=60):
+    """Wait until the server accepts connections"""
+    end = time.perf_counter() + timeout
+    while time.perf_counter() < end:
+        if process is not None and process.poll() is not None:
+            sys.exit("server exited")
+        try:
+            connection = http.client.HTTPConnection(args.host, args.port)
+            return request(connection, "GET", "/")[1]
+        except OSError:
+            time.sleep(0.1)
+    sys.exit("server not reachable")
+
+
+def run(args):
+    """Start the server on a synthetic organizer if no port is given, run the
+    client pool and print the results"""
+    process = None
+    with tempfile.TemporaryDirectory() as path:
+        if args.port is None:
+            suite.generate(args.items, path)
+            args.port = conf.SERVER_PORT
+            server = os.path.join(os.path.dirname(__file__), "..", "server.py")
+            command = [sys.executable, server, "--directory", path]
+            command += ["--host", args.host, "--port", str(args.port)]
+            process = subprocess.Popen(command)
+        try:
+            info = wait_for_server(args, process)
+            with multiprocessing.Pool(args.clients) as pool:
+                start = time.perf_counter()
+                results = pool.starmap(
+                    client, [(args, i, info["drawers"]) for i in range(args.clients)]
+                )
+                duration = time.perf_counter() - start
+        finally:
+            if process is not None:
+                process.terminate()
+                process.wait()
+
+    latencies = {}
+    errors = 0
+    for client_latencies, client_errors in results:
+        errors += client_errors
+        for name, values in client_latencies.items():
+            latencies.setdefault(name, []).extend(values)
+    total = sum(len(values) for values in latencies.values())
+    print(f"{total} requests in {duration:.1f} s, {total / duration:.0f} per second")
+    print(f"{errors} failed requests")
+    summary = {}
+    columns = [f"p{p}" for p in PERCENTILES] + ["max"]
+    print(f"{'latency [ms]':<16}{'count':>8}" + "".join(f"{c:>10}" for c in columns))
+    for name, values in sorted(latencies.items()):
+        values.sort()
+        stats = {"count": len(values)}
+        for p in PERCENTILES:
+            i = min(len(values) - 1, len(values) * p // 100)
+            stats[f"p{p}"] = values[i] * 1000
+        stats["max"] = values[-1] * 1000
+        summary[name] = stats
+        row = "".join(f"{stats[c]:10.3f}" for c in columns)
+        print(f"{name:<16}{stats['count']:>8}{row}")
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            json.dump({"requests": total, "errors": errors, "latency": summary}, f)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--host", default=conf.SERVER_HOST)
+    parser.add_argument(
+        "--port", type=int, help="use a running server instead of a synthetic one"
+    )
+    parser.add_argument("--items", type=int, default=10000)
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument(
+        "--writes", type=float, default=0.1, help="share of modifications"
+    )
+    parser.add_argument("--output")
+    args = parser.parse_args()
+    run(args)
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""Measure the memory used per item by a synthetic organizer including its
+boxes, drawers and search index, and compare the compact model items to
+plain objects with an instance dictionary"""
+
+import argparse
+import gc
+import itertools
+import json
+import os
+import sys
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import model  # noqa: E402
+import settings as conf  # noqa: E402
+import suite  # noqa: E402
+
+
+class Item:
+    """Item as stored before, with an instance dictionary and own strings"""
+
+    def __init__(self, name, amount=None):
+        self.name = name
+        self.amount = amount
+        self.lower = self.name.lower()
+
+    @classmethod
+    def fromdict(cls, dct):
+        return Item(dct["name"], dct["amount"])
+
+
+def measure(create, count):
+    """Return the bytes per item kept alive by the result of create"""
+    gc.collect()
+    tracemalloc.start()
+    result = create()
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return size / count
+
+
+def read_organizer(text):
+    """Create the organizer from the json text like when reading it"""
+    return model.Organizer.fromdict(json.loads(text))
+
+
+def read_items(cls, text):
+    """Create the items of all drawers only"""
+    dcts = json.loads(text)
+    boxes = dcts[model.Organizer.subelem_name]
+    drawers = [drawer for box in boxes for drawer in box[model.Box.subelem_name]]
+    items = [drawer[model.Drawer.subelem_name] for drawer in drawers]
+    return [cls.fromdict(dct) for dct in itertools.chain.from_iterable(items)]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as path:
+        suite.generate(args.items, path)
+        with open(conf.ORGANIZER_JSON) as f:
+            text = f.read()
+    count = args.items
+    index = conf.SEARCH_INDEX
+    print(f"{count} items, {suite.ITEMS_PER_DRAWER} per drawer")
+    for conf.SEARCH_INDEX in ("none", index):
+        size = measure(lambda: read_organizer(text), count)
+        label = f"organizer, {conf.SEARCH_INDEX} index:"
+        print(f"{label:<28}{size:7.1f} bytes per item")
+    before = measure(lambda: read_items(Item, text), count)
+    after = measure(lambda: read_items(model.Item, text), count)
+    print(f"{'items only, before:':<28}{before:7.1f} bytes per item")
+    ratio = f"({after / before:.0%})"
+    print(f"{'items only, after:':<28}{after:7.1f} bytes per item {ratio}")
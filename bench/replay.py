@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""Record input events of the organizer GUI to a file and replay them into a
+headless window, reporting the latency of each event type and handler"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import pyglet  # noqa: E402
+
+import settings as conf  # noqa: E402
+
+# input events which are recorded and replayed
+EVENTS = [
+    "on_key_press",
+    "on_mouse_drag",
+    "on_mouse_press",
+    "on_mouse_scroll",
+    "on_resize",
+    "on_text",
+    "on_text_motion",
+    "on_text_motion_select",
+]
+# window methods whose latency is measured
+HANDLERS = [
+    "on_click",
+    "on_enter",
+    "on_motion",
+    "on_search",
+    "on_scroll",
+    "on_found",
+    "on_draw",
+]
+PERCENTILES = [50, 90, 99]
+
+
+class Recorder:
+    """Event handlers writing all input events together with their time to a
+    file, one json list per line"""
+
+    def __init__(self, path):
+        self.file = open(path, "w")
+        self.start = time.perf_counter()
+        # pushed by event type, handler objects can't be used since pyglet
+        # only accepts bound methods as their handlers
+        self.handlers = {
+            event_type: self.__recorder(event_type) for event_type in EVENTS
+        }
+
+    def __recorder(self, event_type):
+        def record(*args):
+            t = time.perf_counter() - self.start
+            self.file.write(json.dumps([t, event_type, *args]) + "\n")
+
+        return record
+
+    def close(self):
+        self.file.close()
+
+
+class Timings:
+    """Latencies in seconds collected by name"""
+
+    def __init__(self):
+        self.latencies = {}
+
+    def add(self, name, latency):
+        self.latencies.setdefault(name, []).append(latency)
+
+    def wrap(self, name, func):
+        """Return func measuring the latency of each call under name"""
+
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.add(name, time.perf_counter() - start)
+
+        return timed
+
+    def summary(self):
+        """Return count, percentiles and maximum in milliseconds by name"""
+        summary = {}
+        for name, latencies in sorted(self.latencies.items()):
+            latencies = sorted(latencies)
+            stats = {"count": len(latencies)}
+            for p in PERCENTILES:
+                i = min(len(latencies) - 1, len(latencies) * p // 100)
+                stats[f"p{p}"] = latencies[i] * 1000
+            stats["max"] = latencies[-1] * 1000
+            summary[name] = stats
+        return summary
+
+
+def create_window():
+    """Create window and organizer GUI like the main program does"""
+    from pyglet.graphics import Batch
+
+    from gui import Groups, OrganizerGUI, OrganizerWindow
+    from model import Organizer
+
+    batch = Batch()
+    groups = Groups()
+    window = OrganizerWindow(batch, groups)
+    window.create_widgets()
+    organizer = Organizer.load()
+    return window, organizer, OrganizerGUI(organizer, batch, groups)
+
+
+def start_recording(window, organizer_gui, path):
+    """Show the organizer and record the input events of the window"""
+    window.set_organizer(organizer_gui)
+    # the caret pushed by set_organizer consumes text input, record the
+    # events before it handles them
+    recorder = Recorder(path)
+    window.push_handlers(**recorder.handlers)
+    return recorder
+
+
+def record(args):
+    """Run the organizer and record all input events"""
+    from pyglet import app
+
+    window, organizer, organizer_gui = create_window()
+    recorder = start_recording(window, organizer_gui, args.file)
+    app.run(None if conf.REDRAW_ON_DEMAND else 1 / 60)
+    recorder.close()
+    organizer.save()
+
+
+def replay(args):
+    """Replay recorded input events into a headless window"""
+    from pyglet import app, clock
+    from pyglet.window import Window
+
+    def tick():
+        # search results are posted to the event loop by the search thread
+        app.platform_event_loop.dispatch_posted_events()
+        clock.tick()
+
+    with open(args.file) as f:
+        events = [json.loads(line) for line in f if line.strip()]
+    timings = Timings()
+    with tempfile.TemporaryDirectory() as path:
+        # never modify the real organizer, work on a copy or synthetic one
+        if args.items is not None:
+            import suite
+
+            suite.generate(args.items, path)
+        else:
+            for name in ("ORGANIZER_CONF", "ORGANIZER_JSON", "ORGANIZER_JOURNAL"):
+                copy = os.path.join(path, os.path.basename(getattr(conf, name)))
+                if os.path.exists(getattr(conf, name)):
+                    shutil.copy(getattr(conf, name), copy)
+                setattr(conf, name, copy)
+            conf.ORGANIZER_DB = os.path.join(path, "organizer.db")
+        window, organizer, organizer_gui = create_window()
+        # dispatch events right away instead of queueing them
+        Window._enable_event_queue = False
+        for name in HANDLERS:
+            setattr(window, name, timings.wrap(name, getattr(window, name)))
+        window.set_organizer(organizer_gui)
+        search = window.search.search
+        search.find = timings.wrap("search", search.find)
+        organizer.load_all()
+        window.draw(0)
+
+        start = time.perf_counter()
+        for t, event_type, *event_args in events:
+            # keep the recorded pauses so debounced searches behave alike
+            while time.perf_counter() - start < t / args.speed:
+                tick()
+                time.sleep(0.001)
+            if event_type == "on_resize":
+                window.set_size(*event_args)
+            begin = time.perf_counter()
+            window.dispatch_event(event_type, *event_args)
+            timings.add(event_type, time.perf_counter() - begin)
+            tick()
+        # wait for the last search results
+        end = time.perf_counter() + conf.SEARCH_DEBOUNCE + args.wait
+        while time.perf_counter() < end:
+            tick()
+            time.sleep(0.001)
+        window.close()
+
+    summary = timings.summary()
+    columns = [f"p{p}" for p in PERCENTILES] + ["max"]
+    print(f"{'latency [ms]':<24}{'count':>8}" + "".join(f"{c:>10}" for c in columns))
+    for name, stats in summary.items():
+        values = "".join(f"{stats[c]:10.3f}" for c in columns)
+        print(f"{name:<24}{stats['count']:>8}{values}")
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            json.dump(summary, f, indent=2)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    subparsers = parser.add_subparsers(required=True)
+    parser_record = subparsers.add_parser("record", help="record input events")
+    parser_record.add_argument("file")
+    parser_record.set_defaults(func=record)
+    parser_replay = subparsers.add_parser("replay", help="replay input events")
+    parser_replay.add_argument("file")
+    parser_replay.add_argument("--items", type=int, help="use synthetic organizer")
+    parser_replay.add_argument("--speed", type=float, default=1.0)
+    parser_replay.add_argument("--wait", type=float, default=1.0)
+    parser_replay.add_argument("--output")
+    parser_replay.set_defaults(func=replay)
+    args = parser.parse_args()
+
+    # the replayed window does not need a display
+    if args.func is replay:
+        pyglet.options["headless"] = True
+    args.func(args)
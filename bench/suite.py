@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""Benchmark parsing, loading, saving, searching and converting synthetic
+organizers of different sizes without a display, optionally comparing the
+results to a stored baseline"""
+
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import model  # noqa: E402
+import settings as conf  # noqa: E402
+
+WORDS = [
+    "resistor",
+    "capacitor",
+    "LED",
+    "diode",
+    "transistor",
+    "screw",
+    "nut",
+    "washer",
+    "cable",
+    "M2",
+    "M3",
+    "M4",
+    "10k",
+    "4.7k",
+    "100nF",
+    "10uF",
+    "red",
+    "green",
+    "blue",
+    "black",
+]
+# typical search queries, given as lowercase terms like entered in the GUI
+QUERIES = ["resistor 10k", "m3 screw", "led red", "cap", "blue cable m2"]
+# items per drawer and drawers per box of the synthetic organizers
+ITEMS_PER_DRAWER = 25
+DRAWERS_PER_BOX = 4
+# settings influencing the results, stored along with them
+SETTINGS = ["STORAGE_BACKEND", "SEARCH_INDEX", "FUZZY_SEARCH", "LAZY_LOAD"]
+
+
+def generate(count, path):
+    """Generate config and json files of an organizer with count items in the
+    given directory, use them for all further loading and saving"""
+    conf.ORGANIZER_CONF = os.path.join(path, "organizer.conf")
+    conf.ORGANIZER_JSON = os.path.join(path, "organizer.json")
+    conf.ORGANIZER_JOURNAL = os.path.join(path, "organizer.journal")
+    conf.ORGANIZER_DB = os.path.join(path, "organizer.db")
+    # square layout of single block boxes labeled alternately, layout lines
+    # need to be longer than two characters
+    drawers = math.ceil(count / ITEMS_PER_DRAWER)
+    size = max(2, math.ceil(math.sqrt(math.ceil(drawers / DRAWERS_PER_BOX))))
+    with open(conf.ORGANIZER_CONF, "w") as f:
+        f.write(f"a:{DRAWERS_PER_BOX}\nb:{DRAWERS_PER_BOX}\n")
+        for y in range(size):
+            f.write(" ".join("ab"[(x + y) % 2] for x in range(size)) + "\n")
+    # fill the drawers of the parsed organizer with random items
+    random.seed(0)
+    organizer, seq = model.Organizer.read()
+    for i in range(count):
+        name = " ".join(random.sample(WORDS, 3))
+        amount = random.choice((None, random.randrange(100)))
+        item = model.Item(name, amount)
+        organizer.drawers[i // ITEMS_PER_DRAWER].subelems.append(item)
+    with open(conf.ORGANIZER_JSON, "w") as f:
+        json.dump(organizer.asdict(), f, indent=conf.ORGANIZER_JSON_INDENT)
+
+
+def generate_layout(size, path):
+    """Write a config of size x size blocks filled with boxes of 2 x 2 blocks
+    labeled alternately, return its path"""
+    path = os.path.join(path, "layout.conf")
+    with open(path, "w") as f:
+        f.write(f"a:{DRAWERS_PER_BOX // 2}\nb:{DRAWERS_PER_BOX // 2}\n")
+        for y in range(size):
+            f.write(" ".join("ab"[(x // 2 + y // 2) % 2] for x in range(size)))
+            f.write("\n")
+    return path
+
+
+def measure(func, repeat):
+    """Return the shortest time in seconds of repeatedly calling func"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def run(count, repeat):
+    """Run all benchmarks for an organizer with count items"""
+    results = {}
+    with tempfile.TemporaryDirectory() as path:
+        generate(count, path)
+        parse_config = model.Organizer._Organizer__parse_config
+        results["parse_config"] = measure(
+            lambda: parse_config(conf.ORGANIZER_CONF), repeat
+        )
+        results["load"] = measure(model.Organizer.load, repeat)
+        organizer = model.Organizer.load()
+        organizer.load_all()
+
+        def save():
+            # force writing the organizer even if it was not modified
+            organizer.saved = -1
+            organizer.save()
+
+        results["save"] = measure(save, repeat)
+        queries = [query.split() for query in QUERIES]
+
+        def find():
+            for query in queries:
+                organizer.find(query)
+
+        def find_tree():
+            for query in queries:
+                model.Element.find(organizer, query)
+
+        results["find"] = measure(find, repeat) / len(queries)
+        results["find_tree"] = measure(find_tree, repeat) / len(queries)
+
+        def roundtrip():
+            model.Organizer.fromdict(organizer.asdict())
+
+        results["asdict_fromdict"] = measure(roundtrip, repeat)
+    return results
+
+
+def run_layout(size, repeat):
+    """Run the benchmark of parsing a large layout with size x size blocks"""
+    with tempfile.TemporaryDirectory() as path:
+        path = generate_layout(size, path)
+        parse_config = model.Organizer._Organizer__parse_config
+        return {"parse_config": measure(lambda: parse_config(path), repeat)}
+
+
+def compare(results, baseline, threshold, noise):
+    """Print the results relative to the baseline, return True if any of them
+    is slower than the baseline by more than the threshold, differences below
+    noise seconds are ignored"""
+    regression = False
+    for count, timings in results["results"].items():
+        for name, seconds in timings.items():
+            base = baseline["results"].get(count, {}).get(name)
+            if base is None:
+                print(f"{count:>9} {name:<16} {seconds:10.6f}s")
+                continue
+            ratio = seconds / base if base > 0 else 1
+            mark = ""
+            if ratio > 1 + threshold and seconds - base > noise:
+                mark = " REGRESSION"
+                regression = True
+            print(f"{count:>9} {name:<16} {seconds:10.6f}s {ratio:7.2f}x{mark}")
+    if results["settings"] != baseline["settings"]:
+        print(f"settings differ from baseline: {baseline['settings']}")
+    return regression
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 10**4, 10**6])
+    parser.add_argument(
+        "--layout", type=int, default=1000, help="size of the large layout in blocks"
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", default="results.json")
+    parser.add_argument("--compare", metavar="BASELINE")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    parser.add_argument("--noise", type=float, default=0.001)
+    args = parser.parse_args()
+
+    results = {
+        "settings": {name: getattr(conf, name) for name in SETTINGS},
+        "results": {},
+    }
+    runs = [(str(count), run, count) for count in args.sizes]
+    if args.layout > 0:
+        runs.append((f"{args.layout}x{args.layout}", run_layout, args.layout))
+    for count, func, size in runs:
+        timings = results["results"][count] = func(size, args.repeat)
+        if args.compare is None:
+            for name, seconds in timings.items():
+                print(f"{count:>9} {name:<16} {seconds:10.6f}s")
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+
+    if args.compare is not None:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if compare(results, baseline, args.threshold, args.noise):
+            sys.exit(1)
@@ -0,0 +1,143 @@
+"""Streaming import and export of items as CSV or JSON lines files, each item
+is addressed by its box and the index of its drawer within the box"""
+
+import csv
+import json
+import os
+
+import model
+import settings as conf
+
+# columns of the files: position of the lower left block of the box (counted
+# from the left and bottom starting at 0), index of the drawer within the box
+# (0 for the top drawer), name and amount of the item
+FIELDS = ["x", "y", "drawer", "name", "amount"]
+
+
+class RowError(ValueError):
+    """Invalid row of an imported file"""
+
+
+def get_format(path):
+    """Return the format of a file by its extension, csv or jsonl"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".csv":
+        return "csv"
+    if extension in (".jsonl", ".ndjson"):
+        return "jsonl"
+    raise ValueError(f"unknown format of {path}, use .csv or .jsonl")
+
+
+def read_rows(f, format):
+    """Yield the line number and dict of each row of a file"""
+    if format == "csv":
+        reader = csv.DictReader(f)
+        for row in reader:
+            yield reader.line_num, row
+    else:
+        for n, line in enumerate(f, 1):
+            if line.strip() != "":
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError as e:
+                    raise RowError(f"line {n}: {e}")
+                if not isinstance(row, dict):
+                    raise RowError(f"line {n}: row has to be an object")
+                yield n, row
+
+
+def parse_amount(amount):
+    """Return the amount of a CSV row as number, None if empty, raise a
+    ValueError if it is no number"""
+    if amount is None or amount.strip() == "":
+        return None
+    try:
+        return int(amount)
+    except ValueError:
+        return float(amount)
+
+
+def get_row(organizer, n, row, format):
+    """Return drawer, name and amount of a row, raise a RowError if invalid"""
+    try:
+        x, y, num = (int(row[field]) for field in FIELDS[:3])
+    except KeyError as e:
+        raise RowError(f"line {n}: missing {e.args[0]}")
+    except (TypeError, ValueError):
+        raise RowError(f"line {n}: x, y and drawer have to be numbers")
+    box = organizer.get_box(x, y)
+    if box is None:
+        raise RowError(f"line {n}: no box at {x}, {y}")
+    if not 0 <= num < len(box.subelems):
+        raise RowError(f"line {n}: no drawer {num} in box at {x}, {y}")
+    name = row.get("name")
+    if not isinstance(name, str) or name.strip() == "":
+        raise RowError(f"line {n}: missing name")
+    amount = row.get("amount")
+    if format == "csv":
+        try:
+            amount = parse_amount(amount)
+        except ValueError:
+            raise RowError(f"line {n}: amount has to be a number")
+    elif not model.Item.is_amount(amount):
+        raise RowError(f"line {n}: amount has to be a number")
+    return box.subelems[num], name.strip(), amount
+
+
+def import_items(organizer, path):
+    """Add all items of a file to the organizer and save it once, the file is
+    checked completely first, so no items are added if any row is invalid,
+    return the added items by drawer"""
+    format = get_format(path)
+    with open(path, newline="") as f:
+        for n, row in read_rows(f, format):
+            get_row(organizer, n, row, format)
+    # the items are journaled since the organizer can be modified while
+    # importing, the journal is synced once per batch instead of per item
+    model = organizer.model
+    journal = model.journal
+    if journal is not None:
+        deferred = journal.deferred
+        journal.deferred = True
+    added = {}
+    try:
+        with open(path, newline="") as f:
+            batch = []
+            for n, row in read_rows(f, format):
+                batch.append(get_row(organizer, n, row, format))
+                if len(batch) >= conf.IMPORT_BATCH:
+                    add_batch(organizer, batch, added)
+                    batch = []
+            add_batch(organizer, batch, added)
+    finally:
+        if journal is not None:
+            journal.deferred = deferred
+    model.save()
+    return added
+
+
+def add_batch(organizer, batch, added):
+    """Add (drawer, name, amount) tuples to the organizer and sync them,
+    collect the added items by drawer"""
+    items = organizer.add_items(batch)
+    organizer.model.sync()
+    for (drawer, name, amount), item in zip(batch, items):
+        added.setdefault(drawer, []).append(item)
+
+
+def export_items(organizer, path):
+    """Write all items of the organizer to a file, ordered by box and drawer,
+    items of drawers not loaded yet are not loaded for this"""
+    format = get_format(path)
+    with open(path, "w", newline="") as f:
+        if format == "csv":
+            writer = csv.writer(f)
+            writer.writerow(FIELDS)
+        for box in organizer.subelems:
+            for i, drawer in enumerate(box.subelems):
+                for item in organizer.peek_items(drawer.num):
+                    row = [box.x, box.y, i, item.name, item.amount]
+                    if format == "csv":
+                        writer.writerow(row)
+                    else:
+                        f.write(json.dumps(dict(zip(FIELDS, row))) + "\n")
@@ -0,0 +1,163 @@
+"""Multiple organizers (cabinets) stored in the subdirectories of a directory,
+loaded when they are first viewed and searched in parallel processes if they
+are large"""
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import model
+import settings as conf
+
+# organizers read by a search process together with the state of their
+# files, by directory
+loaded = {}
+
+
+class Cabinets:
+    """Directory of cabinets, each subdirectory containing the config file
+    and the database files of one organizer"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.names = []
+        for name in sorted(os.listdir(directory)):
+            files = model.Files(os.path.join(directory, name))
+            if os.path.exists(files.conf) or os.path.exists(files.json):
+                self.names.append(name)
+        self.organizers = {}
+        self.pool = None
+
+    def get(self, name):
+        """Return the organizer of a cabinet, load it on first access"""
+        organizer = self.organizers.get(name)
+        if organizer is None:
+            files = model.Files(os.path.join(self.directory, name))
+            organizer = self.organizers[name] = model.Organizer.load(files)
+            organizer.start_autosave()
+        return organizer
+
+    def find(self, str, names=None):
+        """Search the given cabinets (all if not given), return the name of the
+        cabinet and drawer number together with the found items (as dicts
+        including their index) of each drawer, sorted by cabinet, large
+        cabinets are searched in parallel processes, small ones within this
+        process to not wait for starting the processes"""
+        if names is None:
+            names = self.names
+        directories = [os.path.join(self.directory, name) for name in names]
+        size = sum(sum(s[1] for s in state(model.Files(d)) if s) for d in directories)
+        if size < conf.PARALLEL_SEARCH_SIZE:
+            results = map(self.__find, names, directories, [str] * len(names))
+        else:
+            if self.pool is None:
+                # threads of the main process must not be forked, the spawned
+                # processes import the settings again, pass the current ones
+                context = multiprocessing.get_context("spawn")
+                self.pool = ProcessPoolExecutor(
+                    conf.SEARCH_PROCESSES,
+                    context,
+                    initializer=configure,
+                    initargs=(settings(),),
+                )
+            results = self.pool.map(find, directories, [str] * len(directories))
+        found = []
+        for name, result in zip(names, results):
+            found += [(name, num, items) for num, items in result]
+        return found
+
+    def __find(self, name, directory, str):
+        """Search a cabinet within this process, use its organizer if loaded"""
+        organizer = self.organizers.get(name)
+        if organizer is None:
+            return find(directory, str)
+        return records(organizer.find(str))
+
+    def save(self):
+        """Save all loaded cabinets"""
+        for organizer in self.organizers.values():
+            organizer.save()
+
+
+class Search:
+    """Search session of the shown cabinet, its results are followed by the
+    results of all other cabinets"""
+
+    def __init__(self, search, cabinets, name):
+        self.search = search
+        self.cabinets = cabinets
+        self.name = name
+
+    def find(self, str):
+        """Return all drawers together with their items containing str, the
+        drawers of other cabinets are given as RemoteDrawer and their items
+        are prefixed by the name of the cabinet"""
+        found = list(self.search.find(str))
+        names = [name for name in self.cabinets.names if name != self.name]
+        for name, num, items in self.cabinets.find(str, names):
+            items = [model.Item(f"{name}: {i['name']}", i["amount"]) for i in items]
+            found.append((RemoteDrawer(name, num), items))
+        return found
+
+
+class RemoteDrawer:
+    """Drawer of another cabinet than the shown one"""
+
+    __slots__ = ("cabinet", "num")
+
+    def __init__(self, cabinet, num):
+        self.cabinet = cabinet
+        self.num = num
+
+
+def settings():
+    """Return the current values of all settings"""
+    return {name: value for name, value in vars(conf).items() if name.isupper()}
+
+
+def configure(settings):
+    """Apply the settings of the main process, executed by each search
+    process before searching"""
+    vars(conf).update(settings)
+
+
+def state(files):
+    """Return modification time and size of all files of an organizer"""
+    result = []
+    journal = files.journal
+    for path in (files.json, journal, journal + ".old", files.db, files.db + "-wal"):
+        try:
+            stat = os.stat(path)
+            result.append((stat.st_mtime_ns, stat.st_size))
+        except FileNotFoundError:
+            result.append(None)
+    return result
+
+
+def find(directory, str):
+    """Search the organizer in a directory, executed by the search processes,
+    read it again if any of its files changed"""
+    files = model.Files(directory)
+    current = state(files)
+    if directory not in loaded or loaded[directory][0] != current:
+        if conf.STORAGE_BACKEND == "sqlite":
+            organizer = model.Organizer.load(files)
+        else:
+            organizer, seq = model.Organizer.read(files)
+        loaded[directory] = (current, organizer)
+    return records(loaded[directory][1].find(str))
+
+
+def records(found):
+    """Return search results as drawer numbers and dicts of the found items
+    including their index within the drawer"""
+    result = []
+    for drawer, items in found:
+        ids = {id(item) for item in items}
+        items = [
+            {"item": i, **item.asdict()}
+            for i, item in enumerate(drawer.subelems)
+            if id(item) in ids
+        ]
+        result.append((drawer.num, items))
+    return result
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""Query and edit the organizer from the command line without starting the
+GUI, all commands print their result as JSON"""
+
+import argparse
+import gc
+import json
+import os
+import shlex
+import sys
+
+import settings as conf
+
+# a single query is answered fastest by checking all items directly instead
+# of building a search index, only parse the items of drawers being accessed
+conf.SEARCH_INDEX = "none"
+conf.FUZZY_SEARCH = False
+conf.LAZY_LOAD = True
+
+import model  # noqa: E402
+
+
+class CommandError(Exception):
+    """Invalid command, reported as error result"""
+
+
+class ArgumentParser(argparse.ArgumentParser):
+    """Argument parser raising errors instead of exiting, used in batch mode"""
+
+    def error(self, message):
+        raise CommandError(message)
+
+
+def items(drawer, found=None):
+    """Return the items of a drawer (only the found ones if given) as list of
+    dicts including their index"""
+    found = None if found is None else {id(item) for item in found}
+    return [
+        {"item": i, "name": item.name, "amount": item.amount}
+        for i, item in enumerate(drawer.get_items())
+        if found is None or id(item) in found
+    ]
+
+
+def get_drawer(organizer, num):
+    """Return the drawer with the given number"""
+    if not 0 <= num < len(organizer.drawers):
+        raise CommandError(f"no drawer {num}")
+    return organizer.drawers[num]
+
+
+def get_item(drawer, num):
+    """Return the item with the given index within a drawer"""
+    if not 0 <= num < len(drawer.get_items()):
+        raise CommandError(f"no item {num} in drawer {drawer.num}")
+    return drawer.get_items()[num]
+
+
+def find(organizer, args):
+    terms = [term.lower() for term in args.terms]
+    return [
+        {"drawer": drawer.num, "items": items(drawer, found)}
+        for drawer, found in organizer.find(terms)
+    ]
+
+
+def find_cabinets(cabinets, args):
+    terms = [term.lower() for term in args.terms]
+    return [
+        {"cabinet": name, "drawer": num, "items": found}
+        for name, num, found in cabinets.find(terms)
+    ]
+
+
+def ls(organizer, args):
+    drawer = get_drawer(organizer, args.drawer)
+    return {"drawer": drawer.num, "items": items(drawer)}
+
+
+def add(organizer, args):
+    drawer = get_drawer(organizer, args.drawer)
+    drawer.add_item(args.name, args.amount)
+    return {"drawer": drawer.num, "item": len(drawer.get_items()) - 1}
+
+
+def rm(organizer, args):
+    drawer = get_drawer(organizer, args.drawer)
+    item = get_item(drawer, args.item)
+    drawer.remove_item(args.item)
+    return {"drawer": drawer.num, "name": item.name, "amount": item.amount}
+
+
+def mv(organizer, args):
+    drawer = get_drawer(organizer, args.drawer)
+    target = get_drawer(organizer, args.target)
+    item = get_item(drawer, args.item)
+    target.add_item(item.name, item.amount)
+    drawer.remove_item(args.item)
+    return {"drawer": target.num, "item": len(target.get_items()) - 1}
+
+
+def import_items(organizer, args):
+    import bulk
+
+    try:
+        added = bulk.import_items(organizer, args.file)
+    except (OSError, ValueError) as e:
+        raise CommandError(str(e))
+    return {"items": sum(map(len, added.values())), "drawers": len(added)}
+
+
+def export_items(organizer, args):
+    import bulk
+
+    try:
+        bulk.export_items(organizer, args.file)
+    except (OSError, ValueError) as e:
+        raise CommandError(str(e))
+    return {"file": args.file}
+
+
+def create_parser(parser):
+    """Add all commands to a given parser"""
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    parser_find = subparsers.add_parser("find", help="find items")
+    parser_find.add_argument("terms", nargs="+")
+    parser_find.set_defaults(func=find)
+    parser_ls = subparsers.add_parser("ls", help="list the items of a drawer")
+    parser_ls.add_argument("drawer", type=int)
+    parser_ls.set_defaults(func=ls)
+    parser_add = subparsers.add_parser("add", help="add an item to a drawer")
+    parser_add.add_argument("drawer", type=int)
+    parser_add.add_argument("name")
+    parser_add.add_argument("amount", type=int, nargs="?")
+    parser_add.set_defaults(func=add)
+    parser_rm = subparsers.add_parser("rm", help="remove an item from a drawer")
+    parser_rm.add_argument("drawer", type=int)
+    parser_rm.add_argument("item", type=int)
+    parser_rm.set_defaults(func=rm)
+    parser_mv = subparsers.add_parser("mv", help="move an item to another drawer")
+    parser_mv.add_argument("drawer", type=int)
+    parser_mv.add_argument("item", type=int)
+    parser_mv.add_argument("target", type=int)
+    parser_mv.set_defaults(func=mv)
+    parser_import = subparsers.add_parser(
+        "import", help="add the items of a CSV or JSON lines file"
+    )
+    parser_import.add_argument("file")
+    parser_import.set_defaults(func=import_items)
+    parser_export = subparsers.add_parser(
+        "export", help="write all items to a CSV or JSON lines file"
+    )
+    parser_export.add_argument("file")
+    parser_export.set_defaults(func=export_items)
+    return subparsers
+
+
+def execute(organizer, args):
+    """Execute a command, return its result or the error"""
+    try:
+        return args.func(organizer, args)
+    except CommandError as e:
+        return {"error": str(e)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--cabinet", help="cabinet to use if using cabinets")
+    subparsers = create_parser(parser)
+    subparsers.add_parser("batch", help="execute commands read from stdin")
+    args = parser.parse_args()
+
+    files = None
+    if conf.CABINETS_DIR is not None:
+        if args.cabinet is None:
+            # only searching can be done across all cabinets
+            if args.command != "find":
+                parser.error("--cabinet is required for this command")
+            from cabinets import Cabinets
+
+            found = find_cabinets(Cabinets(conf.CABINETS_DIR), args)
+            print(json.dumps(found))
+            sys.exit()
+        files = model.Files(os.path.join(conf.CABINETS_DIR, args.cabinet))
+    # loading creates many objects referencing each other (drawers and their
+    # organizer) which are all kept, collecting garbage meanwhile would only
+    # traverse them repeatedly, cycles becoming garbage later are still
+    # collected once it is enabled again
+    gc.disable()
+    organizer = model.Organizer.load(files)
+    gc.enable()
+
+    if args.command == "batch":
+        # modifications are journaled and synced once at the end, as well as
+        # saved once
+        if organizer.journal is not None:
+            organizer.journal.deferred = True
+        batch_parser = ArgumentParser(prog="batch")
+        create_parser(batch_parser)
+        for line in sys.stdin:
+            if line.strip() == "":
+                continue
+            try:
+                result = execute(organizer, batch_parser.parse_args(shlex.split(line)))
+            except (CommandError, ValueError) as e:
+                result = {"error": str(e)}
+            print(json.dumps(result))
+        organizer.sync()
+        organizer.save()
+    else:
+        result = execute(organizer, args)
+        print(json.dumps(result))
+        if "error" in result:
+            sys.exit(1)
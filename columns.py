@@ -0,0 +1,126 @@
+"""Columnar item store, keeps all item names in one contiguous buffer and
+searches them with vectorized operations, requires numpy"""
+
+import math
+
+import numpy as np
+
+import profiling
+
+
+class Columns:
+    """Search index storing all items column-wise: lowercase names as one
+    UTF-8 buffer with offsets, drawer numbers, box numbers and amounts as
+    parallel arrays"""
+
+    # amount of added items searched one by one before rebuilding the arrays
+    merge_size = 1024
+
+    def __init__(self, boxes):
+        # item lists and box number of all drawers, accessed by drawer number
+        self.items = []
+        self.box_nums = []
+        for box_num, box in enumerate(boxes):
+            for drawer in box.subelems:
+                self.items.append(drawer.subelems)
+                self.box_nums.append(box_num)
+        # incremented on every change, used to invalidate search results
+        self.version = 0
+        # item -> row in the arrays, and item by row
+        self.rows = {}
+        self.objects = []
+        # items added after the arrays were built -> drawer number
+        self.added = {}
+        for num, items in enumerate(self.items):
+            for item in items:
+                self.added[item] = num
+        self.merge()
+
+    def merge(self):
+        """Rebuild the arrays from all remaining and added items"""
+        rows = np.flatnonzero(self.alive) if self.objects else []
+        objects = [self.objects[row] for row in rows] + list(self.added)
+        drawers = [self.drawers[row] for row in rows] + list(self.added.values())
+        names = [item.lower.encode() for item in objects]
+        # rows are separated by a null byte, so no term can match across rows
+        self.buffer = b"\0".join(names)
+        self.data = np.frombuffer(self.buffer, np.uint8)
+        # occurrences of each byte value, the rarest byte of a term is searched
+        self.counts = np.bincount(self.data, minlength=256)
+        self.offsets = np.zeros(len(names) + 1, np.int64)
+        lengths = np.fromiter(map(len, names), np.int64, len(names))
+        np.cumsum(lengths + 1, out=self.offsets[1:])
+        self.drawers = np.array(drawers, np.int32)
+        self.boxes = np.array(self.box_nums, np.int32)[self.drawers]
+        self.amounts = np.fromiter(
+            (self.__number(item.amount) for item in objects), np.float64, len(objects)
+        )
+        self.alive = np.ones(len(objects), bool)
+        self.objects = objects
+        self.rows = {item: row for row, item in enumerate(objects)}
+        self.added = {}
+
+    @staticmethod
+    def __number(amount):
+        """Return the amount as number, NaN if it is not set or not numeric"""
+        if isinstance(amount, (int, float)):
+            return amount
+        return math.nan
+
+    def add(self, num, item):
+        """Add an item contained in the drawer with the given number"""
+        self.version += 1
+        self.added[item] = num
+        # merge on modification, so searching never changes the arrays
+        if len(self.added) > self.merge_size:
+            self.merge()
+
+    def remove(self, item):
+        """Remove an item from the index"""
+        self.version += 1
+        if item in self.added:
+            del self.added[item]
+        else:
+            self.alive[self.rows.pop(item)] = False
+
+    def mask(self, str):
+        """Return a mask of all rows containing all elems of str, each term is
+        searched with whole-buffer comparisons: all positions of its rarest
+        byte are narrowed down by comparing the other bytes at the offsets"""
+        mask = self.alive.copy()
+        data = self.data
+        for s in str:
+            term = np.frombuffer(s.encode(), np.uint8)
+            rarest = int(np.argmin(self.counts[term]))
+            end = len(data) - len(term) + rarest + 1
+            positions = np.flatnonzero(data[rarest : max(rarest, end)] == term[rarest])
+            for i, byte in enumerate(term):
+                if i != rarest:
+                    positions = positions[data[positions + i] == byte]
+            # rows of all occurrences of s in the buffer
+            rows = np.zeros(len(mask), bool)
+            rows[np.searchsorted(self.offsets, positions, side="right") - 1] = True
+            mask &= rows
+        return mask
+
+    def find(self, str):
+        """Return (drawer number, items) of all items containing all elems
+        of str, None if there are no search terms"""
+        if not str:
+            return None
+        # search the arrays and the added items, group them by drawer
+        found = {}
+        rows = np.flatnonzero(self.mask(str))
+        # matching rows are exact, added items are checked one by one
+        profiling.note("search candidates", len(rows) + len(self.added))
+        for row in rows:
+            found.setdefault(int(self.drawers[row]), set()).add(self.objects[row])
+        for item, num in self.added.items():
+            if item.find(str):
+                found.setdefault(num, set()).add(item)
+        # restore the order of drawers and items within each drawer
+        result = []
+        for num in sorted(found):
+            matches = found[num]
+            result.append((num, [i for i in self.items[num] if i in matches]))
+        return result
@@ -0,0 +1,197 @@
+"""SQLite storage backend, keeps the organizer in a database and finds items
+using a FTS5 full-text index on their names"""
+
+import sqlite3
+
+import model
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS organizers (
+    id INTEGER PRIMARY KEY, width INTEGER, height INTEGER
+);
+CREATE TABLE IF NOT EXISTS boxes (
+    id INTEGER PRIMARY KEY,
+    organizer INTEGER REFERENCES organizers,
+    x INTEGER,
+    y INTEGER,
+    w INTEGER,
+    h INTEGER
+);
+CREATE TABLE IF NOT EXISTS drawers (
+    id INTEGER PRIMARY KEY, box INTEGER REFERENCES boxes
+);
+CREATE TABLE IF NOT EXISTS items (
+    id INTEGER PRIMARY KEY, drawer INTEGER REFERENCES drawers, name TEXT, amount
+);
+CREATE INDEX IF NOT EXISTS items_drawer ON items (drawer, id);
+CREATE VIRTUAL TABLE IF NOT EXISTS items_fts USING fts5(
+    name, content=items, content_rowid=id, tokenize=trigram
+);
+CREATE TRIGGER IF NOT EXISTS items_insert AFTER INSERT ON items BEGIN
+    INSERT INTO items_fts (rowid, name) VALUES (new.id, new.name);
+END;
+CREATE TRIGGER IF NOT EXISTS items_delete AFTER DELETE ON items BEGIN
+    INSERT INTO items_fts (items_fts, rowid, name)
+        VALUES ('delete', old.id, old.name);
+END;
+CREATE TRIGGER IF NOT EXISTS items_update AFTER UPDATE OF name ON items BEGIN
+    INSERT INTO items_fts (items_fts, rowid, name)
+        VALUES ('delete', old.id, old.name);
+    INSERT INTO items_fts (rowid, name) VALUES (new.id, new.name);
+END;
+"""
+
+
+class Database:
+    """Database containing an organizer, replaces both journal and search
+    index of the organizer: modifications are stored as single row updates,
+    items are found using a full-text query"""
+
+    def __init__(self, path):
+        # access is guarded by the model lock, allow using it from all threads
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode = WAL")
+        self.connection.executescript(SCHEMA)
+        # incremented on every change, used to invalidate search results
+        self.version = 0
+        # the database never has to be compacted
+        self.size = 0
+        self.items = []
+        self.ids = []
+        self.lookup = {}
+        # modifications are only committed by sync if set, to write batches
+        self.deferred = False
+
+    def read(self):
+        """Read the organizer from the database, None if it is empty"""
+        execute = self.connection.execute
+        row = execute("SELECT width, height FROM organizers").fetchone()
+        if row is None:
+            return None
+        # create drawers and their items first, the organizer creates the fuzzy
+        # index over the items, remember the ids of the items
+        drawers = {}
+        self.items = []
+        for (box,) in execute("SELECT box FROM drawers ORDER BY id"):
+            drawer = model.Drawer([])
+            drawers.setdefault(box, []).append(drawer)
+            self.items.append(drawer.subelems)
+        self.ids = [[] for _ in self.items]
+        self.lookup = {}
+        for id, num, name, amount in execute(
+            "SELECT id, drawer, name, amount FROM items ORDER BY drawer, id"
+        ):
+            item = model.Item(name, amount)
+            self.items[num].append(item)
+            self.ids[num].append(id)
+            self.lookup[id] = item
+        boxes = []
+        for id, x, y, w, h in execute("SELECT id, x, y, w, h FROM boxes ORDER BY id"):
+            boxes.append(model.Box(drawers[id], x, y, w, h))
+        organizer = model.Organizer(boxes, row[0], row[1], index=self)
+        organizer.journal = self
+        organizer.database = self
+        return organizer
+
+    def write(self, organizer):
+        """Replace the content of the database with the given organizer"""
+        with self.connection:
+            execute = self.connection.execute
+            for table in ("items", "drawers", "boxes", "organizers"):
+                execute(f"DELETE FROM {table}")
+            size = (organizer.w, organizer.h)
+            execute("INSERT INTO organizers VALUES (1, ?, ?)", size)
+            num = 0
+            for id, box in enumerate(organizer.subelems):
+                execute(
+                    "INSERT INTO boxes VALUES (?, 1, ?, ?, ?, ?)",
+                    (id, box.x, box.y, box.w, box.h),
+                )
+                for drawer in box.subelems:
+                    execute("INSERT INTO drawers VALUES (?, ?)", (num, id))
+                    self.connection.executemany(
+                        "INSERT INTO items (drawer, name, amount) VALUES (?, ?, ?)",
+                        [(num, item.name, item.amount) for item in drawer.subelems],
+                    )
+                    num += 1
+
+    def add(self, num, item):
+        """Item has been added to the index, stored on append"""
+        self.version += 1
+
+    def remove(self, item):
+        """Item has been removed from the index, stored on append"""
+        self.version += 1
+
+    def append(self, record):
+        """Store a modification of the organizer, commit it unless committing
+        is deferred"""
+        if self.deferred:
+            self.__store(*record)
+        else:
+            with self.connection:
+                self.__store(*record)
+
+    def __store(self, op, num, *args):
+        execute = self.connection.execute
+        if op == "add":
+            name, amount = args
+            id = execute(
+                "INSERT INTO items (drawer, name, amount) VALUES (?, ?, ?)",
+                (num, name, amount),
+            ).lastrowid
+            self.ids[num].append(id)
+            self.lookup[id] = self.items[num][-1]
+        elif op == "rename":
+            i, name = args
+            id = self.ids[num][i]
+            execute("UPDATE items SET name = ? WHERE id = ?", (name, id))
+        elif op == "remove":
+            (i,) = args
+            id = self.ids[num].pop(i)
+            del self.lookup[id]
+            execute("DELETE FROM items WHERE id = ?", (id,))
+        elif op == "amount":
+            i, amount = args
+            id = self.ids[num][i]
+            execute("UPDATE items SET amount = ? WHERE id = ?", (amount, id))
+
+    def sync(self):
+        """Commit all stored modifications"""
+        self.connection.commit()
+
+    def find(self, str):
+        """Return (drawer number, items) of all items containing all elems
+        of str, None if str is too short to be looked up in the index"""
+        terms = ['"' + s.replace('"', '""') + '"' for s in str if len(s) >= 3]
+        if not terms:
+            return None
+        rows = self.connection.execute(
+            "SELECT items.id, items.drawer FROM items_fts "
+            "JOIN items ON items.id = items_fts.rowid "
+            "WHERE items_fts MATCH ? ORDER BY items.drawer, items.id",
+            (" AND ".join(terms),),
+        )
+        # confirm matches, the full-text index might fold cases differently
+        result = []
+        for id, num in rows:
+            item = self.lookup[id]
+            if item.find(str):
+                if result == [] or result[-1][0] != num:
+                    result.append((num, []))
+                result[-1][1].append(item)
+        return result
+
+
+def load(files):
+    """Load the organizer from the database, migrate the json database file
+    (or the config file if there is none) on first use"""
+    db = Database(files.db)
+    organizer = db.read()
+    if organizer is None:
+        organizer, seq = model.Organizer.read(files)
+        organizer.load_all()
+        db.write(organizer)
+        organizer = db.read()
+    organizer.files = files
+    return organizer
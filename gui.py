@@ -1,26 +1,58 @@
-from pyglet import event
+import math
+import os
+import sys
+import threading
+import time
+
+from pyglet import app, clock
+from pyglet.event import EventDispatcher
 from pyglet.gl import GL_TRIANGLES, glClearColor
-from pyglet.graphics import Group, ShaderGroup
+from pyglet.graphics import Batch, Group, ShaderGroup
 from pyglet.graphics.shader import Shader, ShaderProgram
 from pyglet.shapes import Rectangle
-from pyglet.text import Label, caret
-from pyglet.text.document import FormattedDocument
-from pyglet.text.layout import IncrementalTextLayout
 from pyglet.window import Window, key
 
 import model
+import profiling
 import settings as conf
 
 
 class OrganizerWindow(Window):
     """Main program window, handles the background color and resizing"""
 
+    # arrow keys and the corresponding direction to move the selection to
+    directions = {key.UP: "up", key.DOWN: "down", key.LEFT: "left", key.RIGHT: "right"}
+    # events possibly changing the window content
+    redraw_events = {
+        "on_activate",
+        "on_expose",
+        "on_file_drop",
+        "on_imported",
+        "on_key_press",
+        "on_mouse_drag",
+        "on_mouse_press",
+        "on_mouse_scroll",
+        "on_resize",
+        "on_show",
+        "on_text",
+        "on_text_motion",
+        "on_text_motion_select",
+    }
+
     def __init__(self, batch, groups):
+        # set before creating the window, events are dispatched right away
+        self.invalid = False
         if conf.FULLSCREEN:
-            super().__init__(caption=conf.WINDOW_TITLE, fullscreen=True)
+            super().__init__(
+                caption=conf.WINDOW_TITLE, fullscreen=True, file_drops=True
+            )
         else:
             super().__init__(
-                conf.WINDOW_WIDTH, conf.WINDOW_HEIGHT, conf.WINDOW_TITLE, resizable=True
+                conf.WINDOW_WIDTH,
+                conf.WINDOW_HEIGHT,
+                conf.WINDOW_TITLE,
+                resizable=True,
+                file_drops=True,
             )
         glClearColor(
             conf.BACKGROUND_COLOR[0] / 255,
@@ -29,6 +61,36 @@ class OrganizerWindow(Window):
             1,
         )
 
+        # initialize member variables, the text input and item list are
+        # created by create_widgets once the window is shown
+        self.batch = batch
+        self.groups = groups
+        self.text_input = None
+        self.item_list = None
+        self.overlay = None
+        self.message = None
+        self.organizer = None
+        self.search = None
+        self.cabinets = None
+        self.cabinet = 0
+        self.organizers = {}
+        self.prev_w = 0
+        self.prev_h = 0
+        self.active_drawer = None
+        self.found = []
+        self.item_drawers = []
+        self.text = ""
+        self.drawer_selected = False
+        self.renaming = False
+        self.shown = False
+        self.invalidate()
+
+    def create_widgets(self):
+        """Create text input, item list, message and the profiling overlay"""
+        from pyglet.text import Label
+
+        from widgets import ItemList, TextInput
+
         # define callbacks used by caret in text input
         def click_callback(x, y):
             self.on_click(x, y)
@@ -42,41 +104,142 @@ class OrganizerWindow(Window):
         def find_callback(text):
             self.on_search(text)
 
-        # create text input and item list
+        def scroll_callback(x, y, scroll_y):
+            self.on_scroll(x, y, scroll_y)
+
+        def blink_callback():
+            self.invalidate()
+
+        # create text input and item list, the caret handles input events once
+        # an organizer is set
         self.text_input = TextInput(
-            batch,
-            groups,
+            self.batch,
+            self.groups,
             click_callback,
             enter_callback,
             motion_callback,
             find_callback,
+            scroll_callback,
+            blink_callback,
         )
-        self.item_list = ItemList(self.text_input.font_height, batch, groups)
-        # initialize member variables
-        self.batch = batch
-        self.prev_w = 0
-        self.prev_h = 0
-        self.active_drawer = None
-        self.found = []
-        self.item_drawers = []
-        self.text = ""
-        self.drawer_selected = False
-        self.renaming = False
+        self.item_list = ItemList(self.text_input.font_height, self.batch, self.groups)
+        # messages like failed imports, shown above the organizer until cleared
+        self.message = Label(
+            "",
+            font_name=conf.FONT_NAME,
+            font_size=conf.FONT_SIZE * 0.6,
+            anchor_y="top",
+            multiline=True,
+            width=conf.FONT_SIZE * 40,
+            color=conf.FONT_COLOR,
+            batch=self.batch,
+            group=self.groups.overlay,
+        )
+        self.message.visible = False
+        # create overlay showing the timings if profiling
+        if conf.PROFILING:
+            self.overlay = Label(
+                "",
+                font_name=conf.FONT_NAME,
+                font_size=conf.FONT_SIZE * 0.6,
+                anchor_y="top",
+                multiline=True,
+                width=conf.FONT_SIZE * 40,
+                color=conf.FONT_COLOR,
+                batch=self.batch,
+                group=self.groups.overlay,
+            )
+            self.overlay.visible = False
 
     def set_organizer(self, organizer):
+        """Show a given organizer, clear the state of the previous one"""
+        if self.organizer is not None:
+            self.clear_all()
+            self.text_input.clear_text()
+            self.activate_drawer(None)
+            self.renaming = False
+            # resize the organizer on next draw
+            self.prev_w = 0
+            organizer.start_loading()
+        else:
+            self.push_handlers(self.text_input.caret)
         self.organizer = organizer
-
+        search = model.Search(organizer)
+        if self.cabinets is not None:
+            # search the other cabinets as well
+            from cabinets import Search
+
+            name = self.cabinets.names[self.cabinet]
+            search = Search(search, self.cabinets, name)
+        if self.search is None:
+            self.search = SearchExecutor(search, self.on_found, self.on_search_error)
+        else:
+            self.search.set_search(search)
+        self.invalidate()
+
+    def set_cabinets(self, cabinets):
+        """Set the cabinets to switch between and show the first one"""
+        self.cabinets = cabinets
+        self.show_cabinet(0)
+
+    def show_cabinet(self, num):
+        """Show the cabinet with a given number, create its GUI on first use
+        and keep it for switching back"""
+        self.cabinet = num % len(self.cabinets.names)
+        name = self.cabinets.names[self.cabinet]
+        organizer = self.organizers.get(name)
+        if organizer is None:
+            organizer = self.organizers[name] = OrganizerGUI(
+                self.cabinets.get(name), Batch(), self.groups
+            )
+        self.set_caption(f"{conf.WINDOW_TITLE} - {name}")
+        self.set_organizer(organizer)
+
+    def dispatch_event(self, event_type, *args):
+        """Dispatch an event, redraw the window if it may have changed"""
+        result = super().dispatch_event(event_type, *args)
+        if event_type in self.redraw_events:
+            self.invalidate()
+        return result
+
+    def invalidate(self):
+        """Window content changed, schedule a redraw if redrawing on demand"""
+        if conf.REDRAW_ON_DEMAND and not self.invalid:
+            self.invalid = True
+            clock.schedule_once(self.__redraw, 0)
+
+    def __redraw(self, dt):
+        self.invalid = False
+        # e.g. the caret keeps blinking after the window was closed
+        if self.context is not None:
+            self.draw(dt)
+
+    @profiling.profile("OrganizerWindow.on_draw")
     def on_draw(self):
         """Window content needs to be redrawn, resize contents if necassary"""
         self.clear()
+        # only the background is shown until an organizer is set
+        if self.organizer is None:
+            return
         if self.width != self.prev_w or self.height != self.prev_h:
             self.prev_w = self.width
             self.prev_h = self.height
             self.organizer.resize(
                 self.prev_w, self.prev_h, self.text_input, self.item_list
             )
+        if self.message.visible:
+            self.message.position = (5, self.height - 5, 0)
+        if self.overlay is not None and self.overlay.visible:
+            self.overlay.position = (5, self.height - 5, 0)
+            self.overlay.text = profiling.summary()
+        # organizers of cabinets have their own batch
+        if self.organizer.batch is not self.batch:
+            self.organizer.batch.draw()
         self.batch.draw()
-        self.push_handlers(self.text_input.caret)
+        # load pending items once the first frame is shown
+        if not self.shown:
+            self.shown = True
+            self.organizer.start_loading()
 
     def on_click(self, x, y):
         """Mouse has been clicked at given coordinate, (de-)select drawer"""
@@ -94,9 +257,7 @@ class OrganizerWindow(Window):
         if text != "":
             if self.drawer_selected:
                 if self.renaming:
-                    item = self.item_list.items[selected]
-                    item.name = text
-                    item.lower = text.lower()
+                    self.active_drawer.rename_item(selected, text)
                     self.renaming = False
                 else:
                     self.active_drawer.add_item(text)
@@ -104,6 +265,10 @@ class OrganizerWindow(Window):
                 self.item_list.set_items(items)
             elif selected >= 0:
                 drawer = self.item_drawers[selected]
+                if not isinstance(drawer, model.Drawer):
+                    # drawer of another cabinet, show it first
+                    self.show_cabinet(self.cabinets.names.index(drawer.cabinet))
+                    drawer = self.organizer.drawers[drawer.num]
                 self.activate_drawer(drawer, True)
             else:
                 self.clear_all()
@@ -125,11 +290,68 @@ class OrganizerWindow(Window):
                 self.item_list.set_items(items)
 
     def on_key_press(self, symbol, mod):
-        """Clear all input on ESC"""
+        """Clear all input on ESC, switch cabinets and toggle the profiling
+        overlay on their keys"""
+        if self.organizer is None:
+            return
         if symbol == key.ESCAPE:
             self.clear_all()
             self.text_input.clear_text()
             self.renaming = False
+        elif self.cabinets is not None and len(self.cabinets.names) > 1:
+            if symbol == getattr(key, conf.PREVIOUS_CABINET_KEY):
+                self.show_cabinet(self.cabinet - 1)
+            elif symbol == getattr(key, conf.NEXT_CABINET_KEY):
+                self.show_cabinet(self.cabinet + 1)
+        if self.overlay is not None:
+            if symbol == getattr(key, conf.PROFILING_OVERLAY_KEY):
+                self.overlay.visible = not self.overlay.visible
+
+    def on_file_drop(self, x, y, paths):
+        """Import the items of dropped CSV or JSON lines files on a separate
+        thread, the results are shown once all of them are added"""
+        if self.organizer is None:
+            return
+        self.clear_all()
+        self.text_input.clear_text()
+        self.activate_drawer(None)
+        # not a daemon thread, so exiting waits for the import to be saved
+        thread = threading.Thread(
+            target=self.import_files, args=(self.organizer, paths)
+        )
+        thread.start()
+
+    def import_files(self, organizer, paths):
+        """Import thread, add the items of all files and pass the added items
+        and failures to the main thread"""
+        import bulk
+
+        added = {}
+        errors = []
+        for path in paths:
+            try:
+                for drawer, items in bulk.import_items(organizer, path).items():
+                    added.setdefault(drawer, []).extend(items)
+            except Exception as e:
+                errors.append(f"importing {os.path.basename(path)} failed: {e}")
+        app.platform_event_loop.post_event(
+            self, "on_imported", organizer, added, errors
+        )
+
+    def on_imported(self, organizer, added, errors):
+        """Import finished, highlight the drawers and list the added items if
+        their organizer is still shown and report the failed files, items
+        removed meanwhile are left out"""
+        if organizer is self.organizer:
+            found = []
+            for drawer in sorted(added, key=lambda drawer: drawer.num):
+                contained = {id(item) for item in drawer.get_items()}
+                items = [item for item in added[drawer] if id(item) in contained]
+                if items:
+                    found.append((drawer, items))
+            self.on_found(found)
+        self.message.text = "\n".join(errors)
+        self.message.visible = errors != []
 
     def on_motion(self, motion):
         """Handle motion input like up, down, left, right and delete"""
@@ -142,43 +364,82 @@ class OrganizerWindow(Window):
                     self.item_list.select(selected - 1)
                 elif motion == key.MOTION_DELETE:
                     if selected >= 0 and self.active_drawer is not None:
-                        del self.active_drawer.get_items()[selected]
+                        self.active_drawer.remove_item(selected)
                         items = self.active_drawer.get_items()
                         self.item_list.set_items(items)
                         self.item_list.select()
                 if self.text != "" and not self.drawer_selected:
                     new_selected = self.item_list.get_selected()
                     if selected != new_selected:
-                        if selected >= 0:
-                            self.item_drawers[selected].highlight(conf.HIGHLIGHT_MASK)
-                        if new_selected >= 0:
-                            self.item_drawers[new_selected].highlight(conf.SELECT_MASK)
+                        self.highlight_item(selected, conf.HIGHLIGHT_MASK)
+                        self.highlight_item(new_selected, conf.SELECT_MASK)
             elif self.active_drawer is None:
                 self.activate_drawer(self.get_box(0, 0).subelems[-1])
             else:
                 self.move(motion)
 
+    def on_scroll(self, x, y, scroll_y):
+        """Mouse wheel has been scrolled, scroll the item list if hovered"""
+        if self.item_list.contains(x, y):
+            self.item_list.scroll(-scroll_y)
+
+    @profiling.profile("OrganizerWindow.on_search")
     def on_search(self, text):
         """Handle the search of the organizer for items"""
         if not self.drawer_selected:
             if self.text != text:
-                self.clear_all()
+                # keep highlights until the results arrive to only update changes
+                self.clear_all(keep_found=True)
                 self.text = text
                 if len(text.strip()) >= conf.FIND_MIN_LENGTH:
-                    items = []
-                    self.item_drawers = []
-                    self.found = self.organizer.find(text.lower().split())
-                    for drawer, i in self.found:
-                        drawer.highlight(conf.HIGHLIGHT_MASK)
-                        items += i
-                        self.item_drawers += [drawer] * len(i)
-                    self.item_list.set_items(items)
-
-    def clear_all(self):
+                    self.search.submit(text.lower().split())
+                else:
+                    self.show_found([])
+
+    def on_found(self, found):
+        """Search results are available, highlight drawers and list items"""
+        self.message.visible = False
+        items = []
+        self.item_drawers = []
+        self.show_found(found)
+        for drawer, i in self.found:
+            items += i
+            self.item_drawers += [drawer] * len(i)
+        self.item_list.set_items(items)
+        profiling.note("found drawers", len(found))
+        profiling.note("found items", len(items))
+        self.invalidate()
+
+    def on_search_error(self, error):
+        """Search failed, show no results but the error"""
+        self.on_found([])
+        self.message.text = f"searching failed: {error}"
+        self.message.visible = True
+        self.invalidate()
+
+    def highlight_item(self, num, color_mask):
+        """Highlight the drawer of the listed item with a given index if it is
+        one of the shown cabinet"""
+        if num >= 0 and isinstance(self.item_drawers[num], model.Drawer):
+            self.item_drawers[num].highlight(color_mask)
+
+    def show_found(self, found):
+        """Highlight the drawers of found items, only drawers whose highlighting
+        changed compared to the previously found ones are updated, drawers of
+        other cabinets are only listed"""
+        prev = {d for d, items in self.found if isinstance(d, model.Drawer)}
+        new = {d for d, items in found if isinstance(d, model.Drawer)}
+        masks = dict.fromkeys(prev - new, (0, 0, 0))
+        masks.update(dict.fromkeys(new, conf.HIGHLIGHT_MASK))
+        self.organizer.highlight(masks)
+        self.found = found
+
+    def clear_all(self, keep_found=False):
         """Clear all selections, highlights and text input"""
-        for drawer, items in self.found:
-            drawer.highlight()
-        self.found = []
+        self.search.cancel()
+        if not keep_found:
+            self.show_found([])
+            self.message.visible = False
         self.item_list.select()
         self.item_list.set_items()
         if self.active_drawer is not None:
@@ -187,34 +448,18 @@ class OrganizerWindow(Window):
         self.text = ""
 
     def move(self, motion):
-        """Select drawer using the arrow keys"""
-        box = self.active_drawer.box
-        drawers = box.subelems
-        drawer_index = drawers.index(self.active_drawer)
-        if motion == key.DOWN:
-            if drawer_index < len(drawers) - 1:
-                self.activate_drawer(drawers[drawer_index + 1])
-            else:
-                new_box = self.get_box(box.x, box.y - 1)
-                if new_box is not None:
-                    self.activate_drawer(new_box.subelems[0])
-        elif motion == key.UP:
-            if drawer_index > 0:
-                self.activate_drawer(drawers[drawer_index - 1])
-            else:
-                new_box = self.get_box(box.x, box.y + box.h)
-                if new_box is not None:
-                    self.activate_drawer(new_box.subelems[-1])
-        elif motion == key.LEFT:
-            new_box = self.get_box(box.x - 1, box.y)
-            if new_box is not None:
-                index = drawer_index * len(new_box.subelems) // len(drawers)
-                self.activate_drawer(new_box.subelems[index])
-        elif motion == key.RIGHT:
-            new_box = self.get_box(box.x + box.w, box.y)
-            if new_box is not None:
-                index = drawer_index * len(new_box.subelems) // len(drawers)
-                self.activate_drawer(new_box.subelems[index])
+        """Select drawer using the arrow and page keys"""
+        if motion in self.directions:
+            direction = self.directions[motion]
+            drawer = self.organizer.get_neighbour(self.active_drawer, direction)
+        elif motion == key.MOTION_NEXT_PAGE:
+            drawer = self.organizer.jump(self.active_drawer, conf.JUMP_DRAWERS)
+        elif motion == key.MOTION_PREVIOUS_PAGE:
+            drawer = self.organizer.jump(self.active_drawer, -conf.JUMP_DRAWERS)
+        else:
+            drawer = None
+        if drawer is not None:
+            self.activate_drawer(drawer)
 
     def activate_drawer(self, drawer, selected=False):
         """Set the active drawer and highlight it accordingly"""
@@ -239,21 +484,16 @@ class OrganizerWindow(Window):
 
     def get_box(self, x, y):
         """Return the box at a given coordinate"""
-        for box in self.organizer.subelems:
-            if (
-                x >= box.x
-                and x <= box.x + box.w - 1
-                and y >= box.y
-                and y <= box.y + box.h - 1
-            ):
-                return box
-        return None
+        return self.organizer.get_box(x, y)
+
+
+OrganizerWindow.register_event_type("on_imported")
 
 
-class OrganizerGUI(model.Element):
+class OrganizerGUI(model.Organizer):
     """Class of organizer objects with resizeable GUI"""
 
-    def __init__(self, organizer, batch, groups):
+    def __init__(self, organizer, batch, groups, defer=False):
         # draw organizer background
         self.rect = Rectangle(
             0, 0, 100, 100, color=conf.BOX_COLOR, batch=batch, group=groups[0]
@@ -261,14 +501,43 @@ class OrganizerGUI(model.Element):
         # create list of BoxGUI objects from boxes
         boxes_gui = []
         for box in organizer.subelems:
-            boxes_gui.append(
-                BoxGUI(box.subelems, box.x, box.y, box.w, box.h, batch, groups)
-            )
-        # intialize parent class with newly created boxes_gui
-        super().__init__(boxes_gui)
-        self.w = organizer.w
-        self.h = organizer.h
-
+            boxes_gui.append(BoxGUI(box.subelems, box.x, box.y, box.w, box.h))
+        # intialize parent class with newly created boxes_gui, share model
+        super().__init__(boxes_gui, organizer.w, organizer.h, organizer)
+        self.batch = batch
+        self.groups = groups
+        self.block_size = 0
+        # current color mask of each drawer, accessed by drawer number
+        self.masks = [(0, 0, 0)] * len(self.drawers)
+        for box in boxes_gui:
+            box.organizer = self
+        # draw all drawers using a single vertex list if configured, fall back
+        # to a vertex list per drawer if numpy is missing
+        self.mesh = None
+        if conf.DRAWER_MESH:
+            try:
+                import mesh
+            except ImportError as e:
+                print(f"drawer mesh not available: {e}", file=sys.stderr)
+            else:
+                self.mesh = mesh.DrawerMesh(self, batch, groups)
+        # amount of drawers whose graphics are created, the mesh contains all
+        self.created = 0 if self.mesh is None else len(self.drawers)
+        if not defer:
+            self.create_graphics()
+
+    def create_graphics(self, count=None):
+        """Create the graphics of the next count drawers (of all if not given),
+        return whether the graphics of all drawers are created"""
+        end = len(self.drawers)
+        if count is not None:
+            end = min(self.created + count, end)
+        for drawer in self.drawers[self.created : end]:
+            drawer.create_graphics(self.batch, self.groups)
+        self.created = end
+        return end == len(self.drawers)
+
+    @profiling.profile("OrganizerGUI.resize")
     def resize(self, window_w, window_h, text_input, item_list):
         """Resize the organizer and its subelements to a given window size"""
         try:
@@ -298,11 +567,16 @@ class OrganizerGUI(model.Element):
             text_input.resize(text_x, text_y, text_w)
             item_list.resize(text_x, list_y, text_w, list_h)
             # resize all subelements as well
-            block_size = self.rect.width / self.w
+            block_size = self.block_size = self.rect.width / self.w
             bm = block_size * conf.BOX_MARGIN
             dm = block_size * conf.DRAWER_MARGIN
             hh = block_size * conf.HANDLE_HEIGHT
             ht = block_size * conf.HANDLE_THICKNESS
+            if self.mesh is not None:
+                self.mesh.resize(
+                    self.rect.x, self.rect.y, block_size, bm, dm, hh, ht
+                )
+                return
             for box in self.subelems:
                 box_x = box.x * block_size + self.rect.x
                 box_y = box.y * block_size + self.rect.y
@@ -312,29 +586,45 @@ class OrganizerGUI(model.Element):
         except ZeroDivisionError:
             pass
 
+    def highlight(self, masks):
+        """Highlight drawers with the given color masks (dict of drawer ->
+        color mask), only drawers whose color mask changed are updated"""
+        changed = {}
+        for drawer, mask in masks.items():
+            if self.masks[drawer.num] != mask:
+                self.masks[drawer.num] = mask
+                changed[drawer.num] = mask
+        if self.mesh is not None:
+            self.mesh.set_colors(changed)
+        else:
+            for num, mask in changed.items():
+                self.drawers[num].set_color(mask)
+
     def get_drawer(self, x, y):
         """Return the drawer corresponding to a given coordinate"""
-        for box in self.subelems:
-            for drawer in box.subelems:
-                if drawer.is_clicked(x, y):
-                    return drawer
+        if self.block_size == 0:
+            return None
+        box = self.get_box(
+            math.floor((x - self.rect.x) / self.block_size),
+            math.floor((y - self.rect.y) / self.block_size),
+        )
+        if box is not None:
+            return box.get_drawer(x, y)
         return None
 
 
-class BoxGUI(model.Element):
+class BoxGUI(model.Box):
     """Class of box objects with resizeable GUI"""
 
-    def __init__(self, drawers, x, y, w, h, batch, groups):
-        self.x = x
-        self.y = y
-        self.w = w
-        self.h = h
+    def __init__(self, drawers, x, y, w, h):
         # create list of DrawerGUI objects from drawers
         drawers_gui = []
         for drawer in drawers:
-            drawers_gui.append(DrawerGUI(drawer.subelems, self, batch, groups))
+            drawers_gui.append(DrawerGUI(drawer.subelems, self))
         # intialize parent class with newly created drawers_gui
-        super().__init__(drawers_gui)
+        super().__init__(drawers_gui, x, y, w, h)
+        self.module_y = 0
+        self.module_h = 0
 
     def resize(self, x, y, w, h, bm, dm, hh, ht):
         """Resize the box and its subelements to a given pixel size"""
@@ -345,18 +635,40 @@ class BoxGUI(model.Element):
         drawer_h = module_h - 2 * dm
         drawer_x = x + bm + dm
         module_y = y + bm + dm
+        # modules include the drawer margin, so rounding at the edges of the
+        # drawers can't select the wrong module when clicked
+        self.module_y = y + bm
+        self.module_h = module_h
         # resize all drawers with the new parameters
         for i, drawer in enumerate(self.subelems):
             drawer_y = module_y + (drawer_num - 1 - i) * module_h
             drawer.resize(drawer_x, drawer_y, drawer_w, drawer_h, hh, ht)
 
+    def get_drawer(self, x, y):
+        """Return the drawer corresponding to a given coordinate"""
+        if self.module_h == 0:
+            return None
+        drawer_num = len(self.subelems)
+        i = drawer_num - 1 - math.floor((y - self.module_y) / self.module_h)
+        if 0 <= i < drawer_num and self.subelems[i].is_clicked(x, y):
+            return self.subelems[i]
+        return None
 
-class DrawerGUI(model.Element):
+
+class DrawerGUI(model.Drawer):
     """Class of drawer objects with resizeable GUI"""
 
-    def __init__(self, items, box, batch, groups):
+    def __init__(self, items, box):
         super().__init__(items)
         self.box = box
+        # graphics are created by create_graphics or by the drawer mesh, the
+        # last size is kept to apply it once they are created
+        self.rect = None
+        self.handle = None
+        self.size = None
+
+    def create_graphics(self, batch, groups):
+        """Create rectangle and handle of the drawer"""
         self.rect = Rectangle(
             0, 0, 1, 1, color=conf.DRAWER_COLOR, batch=batch, group=groups[1]
         )
@@ -369,10 +681,15 @@ class DrawerGUI(model.Element):
             groups.shadergroup,
             colors=("Bn", colors),
         )
+        mask = self.box.organizer.masks[self.num]
+        if mask != (0, 0, 0):
+            self.set_color(mask)
+        if self.size is not None:
+            self.resize(*self.size)
 
     def is_clicked(self, x, y):
         """Test if drawer is clicked"""
-        return (
+        return self.rect is not None and (
             x >= self.rect.x
             and x <= self.rect.x + self.rect.width
             and y >= self.rect.y
@@ -381,6 +698,9 @@ class DrawerGUI(model.Element):
 
     def resize(self, x, y, w, h, hh, ht):
         """Resize the drawer to a given pixel size"""
+        self.size = (x, y, w, h, hh, ht)
+        if self.rect is None:
+            return
         self.rect.x = x
         self.rect.y = y
         self.rect.height = h
@@ -430,229 +750,125 @@ class DrawerGUI(model.Element):
     def highlight(self, color_mask=(0, 0, 0)):
         """Highlight the drawer with a given color mask, remove highlighting
         if no input is given"""
+        self.box.organizer.highlight({self: tuple(color_mask)})
+
+    def set_color(self, color_mask):
+        """Set the colors of drawer and handle to a given color mask"""
+        if self.rect is None:
+            return
         color_rect = []
         color_handle = []
         for i, c in enumerate(color_mask):
             color_rect.append(conf.DRAWER_COLOR[i] + c)
             color_handle.append(conf.HANDLE_COLOR[i] + c)
         self.rect.color = color_rect
-        # self.handle.colors = color_handle * conf.TRIANGLE_COUNT * 3
-
-    def add_item(self, name, amount=None):
-        """Add an item to the drawer"""
-        self.subelems.append(model.Item(name, amount))
-
-    def get_items(self):
-        """Return all items of the drawer"""
-        return self.subelems
-
-    def find(self, str):
-        """Return all items containting str together with the drawer"""
-        items = []
-        for item in self.subelems:
-            items += item.find(str)
-        if items != []:
-            return [(self, items)]
-        return []
-
-
-class TextInput:
-    """Text input field"""
-
-    def __init__(self, batch, groups, on_click, on_enter, on_motion, on_search):
-        # create document
-        self.document = FormattedDocument(" ")
-        self.document.set_style(
-            0,
-            1,
-            dict(
-                font_name=conf.FONT_NAME,
-                font_size=conf.FONT_SIZE,
-                color=conf.FONT_COLOR,
-            ),
-        )
-        # calculate font height and margin
-        font = self.document.get_font(0)
-        self.font_height = font.ascent - font.descent
-        self.margin = self.font_height * conf.TEXT_INPUT_MARGIN
-        # create text input
-        self.input = IncrementalTextLayout(
-            self.document, 100, self.font_height, batch=batch, group=groups[1]
-        )
-        self.input.x = 100
-        self.input.y = 100
-        # creating a caret and push it to window handlers
-        self.caret = Caret(
-            self.input, conf.FONT_COLOR[:3], on_click, on_enter, on_motion, on_search
-        )
-        self.clear_text()
-        # create background rectangle
-        self.rect = Rectangle(
-            0,
-            0,
-            100,
-            self.font_height + 2 * self.margin,
-            color=conf.TEXT_INPUT_COLOR,
-            batch=batch,
-            group=groups[0],
-        )
+        self.handle.colors = color_handle * conf.TRIANGLE_COUNT * 3
+
+
+class SearchExecutor(EventDispatcher):
+    """Runs searches on a worker thread, coalesces queries arriving within the
+    debounce time and drops results of outdated queries, results are passed
+    to the main thread as posted events since the clock isn't thread-safe"""
+
+    def __init__(self, search, on_found, on_error):
+        self.search = search
+        self.on_found = on_found
+        self.on_error = on_error
+        self.condition = threading.Condition()
+        self.generation = 0
+        self.query = None
+        self.time = 0
+        thread = threading.Thread(target=self.__run, daemon=True)
+        thread.start()
+
+    def submit(self, str):
+        """Search for str once no further query arrives within debounce time"""
+        with self.condition:
+            self.generation += 1
+            self.query = str
+            self.time = time.monotonic() + conf.SEARCH_DEBOUNCE
+            self.condition.notify()
+
+    def set_search(self, search):
+        """Use another search session, e.g. of another organizer"""
+        with self.condition:
+            self.generation += 1
+            self.query = None
+            self.search = search
+
+    def cancel(self):
+        """Drop the pending query and the results of running searches"""
+        with self.condition:
+            self.generation += 1
+            self.query = None
+
+    def __run(self):
+        """Worker thread, wait for queries and search for them"""
+        while True:
+            with self.condition:
+                # wait for a query and until the debounce time has passed
+                while self.query is None or time.monotonic() < self.time:
+                    if self.query is None:
+                        self.condition.wait()
+                    else:
+                        self.condition.wait(self.time - time.monotonic())
+                generation = self.generation
+                str = self.query
+                self.query = None
+            # failing searches must not end the thread, they are reported
+            try:
+                found = self.search.find(str)
+            except Exception as e:
+                app.platform_event_loop.post_event(self, "on_failure", generation, e)
+            else:
+                app.platform_event_loop.post_event(
+                    self, "on_results", generation, found
+                )
 
-    def resize(self, x, y, w):
-        """Resize the text input with given coordinates and width"""
-        self.rect.x = x
-        self.rect.y = y
-        self.rect.width = w
-        self.input.x = int(x + self.margin)
-        self.input.y = int(y + self.margin)
-        self.input.width = int(w - 2 * self.margin)
+    def on_results(self, generation, found):
+        """Pass results to the callback on the main thread if still current"""
+        if generation == self.generation:
+            self.on_found(found)
 
-    def get_text(self):
-        """Return currently displayed text"""
-        return self.document.text
+    def on_failure(self, generation, error):
+        """Pass the error of a failed search to the callback on the main
+        thread if still current"""
+        if generation == self.generation:
+            self.on_error(error)
 
-    def set_text(self, text):
-        """Set the text to display"""
-        self.document.text = text
 
-    def clear_text(self):
-        """Clear displayed text"""
-        self.document.text = ""
+SearchExecutor.register_event_type("on_results")
+SearchExecutor.register_event_type("on_failure")
 
 
-class ItemList:
-    """List of items below the text input field drawn to available space"""
+class Groups:
+    """Wrapper around a list of groups and shader"""
 
-    def __init__(self, font_height, batch, groups):
-        self.font_height = font_height
-        self.margin = font_height * conf.TEXT_INPUT_MARGIN
-        self.line_height = self.font_height + 2 * self.margin
-        # create document
-        self.text_box = Label(
-            "",
-            conf.FONT_NAME,
-            conf.FONT_SIZE,
-            width=1,
-            multiline=True,
-            anchor_y="top",
-            color=conf.ITEM_FONT_COLOR,
-            batch=batch,
-            group=groups[2],
-        )
-        # create background rectangle
-        self.rect = Rectangle(
-            0,
-            0,
-            100,
-            self.line_height,
-            color=conf.ITEM_LIST_COLOR,
-            batch=batch,
-            group=groups[0],
-        )
-        # create select rectangle
-        self.select_rect = Rectangle(
-            0,
-            0,
-            100,
-            self.line_height,
-            color=conf.ITEM_SELECT_COLOR,
-            batch=batch,
-            group=groups[1],
-        )
-        self.select_rect.visible = False
-        # initialze member variables
-        self.lines = 0
-        self.select_num = 0
-        self.items = []
-        self.max_h = 1
-        self.y = 0
-
-    def resize(self, x, y, w, max_h):
-        """Resize the list content to given coordinates, width and
-        maximum height"""
-        self.y = y
-        self.max_h = max_h
-        self.__update()
-        self.rect.x = x
-        self.rect.width = w
-        self.select_rect.x = x
-        self.select_rect.width = w
-        self.text_box.x = x + self.margin
-        self.text_box.y = y - self.margin
-        self.text_box.width = w - 2 * self.margin
-
-    def select(self, num=-1):
-        """Select an item via list index"""
-        if num < 0:
-            self.select_rect.visible = False
-            self.__update()
-        elif num < self.lines:
-            self.select_rect.visible = True
-            self.select_num = num
-            self.__update()
-
-    def get_selected(self):
-        """Return index of the selected item, -1 if no item is selected"""
-        if self.select_rect.visible:
-            return self.select_num
-        return -1
-
-    def set_items(self, items=[]):
-        """Set list content to a given list of items"""
-        self.items = items
-        self.__update()
-
-    def __update(self):
-        """Update size and list elements"""
-        self.lines = min(len(self.items), int(self.max_h // self.line_height))
-        h = self.line_height * self.lines
-        self.rect.height = h
-        self.rect.y = self.y - h
-        self.select_rect.y = self.y - self.line_height * (1 + self.select_num)
-        self.text_box.text = "\n\n".join([i.name for i in self.items[: self.lines]])
-
-
-class Caret(caret.Caret):
-    """Custom caret to handle specific events with callbacks"""
-
-    def __init__(self, input, color, on_click, on_enter, on_motion, on_search):
-        super().__init__(input, color=color)
-        self.prev_x = 0
-        self.prev_y = 0
-        self.document = input.document
-        self.on_click = on_click
-        self.on_enter = on_enter
-        self.on_motion = on_motion
-        self.on_search = on_search
-
-    def on_mouse_press(self, x, y, button, modifiers):
-        """Handle mouse press"""
-        if x != self.prev_x and y != self.prev_y:
-            self.prev_x = x
-            self.prev_y = y
-            self.on_click(x, y)
+    def __init__(self):
+        # shader and its group are created on first use
+        self.__shader = None
+        self.__shadergroup = None
 
-    def on_text(self, text):
-        """Handle text input by detecting enter/return events"""
-        if text == conf.CHAR_ENTER:
-            self.on_enter()
-        else:
-            super().on_text(text)
-            self.on_search(self.document.text)
-        return event.EVENT_HANDLED
+        # create all other groups
+        self.groups = [Group(i) for i in range(conf.GROUP_COUNT)]
 
-    def on_text_motion(self, motion, select=False):
-        """Handle motion input events"""
-        super().on_text_motion(motion, select)
-        self.on_motion(motion)
-        self.on_search(self.document.text)
-        return event.EVENT_HANDLED
+        # create group of the profiling overlay (drawn after everything else)
+        self.overlay = Group(conf.GROUP_COUNT + 1)
 
+    @property
+    def shader(self):
+        if self.__shader is None:
+            self.create_shader()
+        return self.__shader
 
-class Groups:
-    """Wrapper around a list of groups and shader"""
+    @property
+    def shadergroup(self):
+        if self.__shadergroup is None:
+            self.create_shader()
+        return self.__shadergroup
 
-    def __init__(self):
-        # create shader program
+    def create_shader(self):
+        """Compile the shader program and create its group"""
         vertex_source = """#version 150 core
             in vec2 position;
             in vec3 colors;
@@ -679,15 +895,12 @@ class Groups:
                 final_color = vertex_colors;
             }
         """
-        self.shader = ShaderProgram(
+        self.__shader = ShaderProgram(
             Shader(vertex_source, "vertex"), Shader(fragment_source, "fragment")
         )
 
         # create shader group (drawn last)
-        self.shadergroup = ShaderGroup(self.shader, conf.GROUP_COUNT)
-
-        # create all other groups
-        self.groups = [Group(i) for i in range(conf.GROUP_COUNT)]
+        self.__shadergroup = ShaderGroup(self.__shader, conf.GROUP_COUNT)
 
     def __getitem__(self, i):
         return self.groups[i]
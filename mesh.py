@@ -0,0 +1,120 @@
+"""Drawer mesh, draws all drawers and their handles using a single vertex
+list and calculates their positions at once, requires numpy"""
+
+import numpy as np
+from pyglet.gl import GL_TRIANGLES
+
+import settings as conf
+
+# amount of vertices of a drawer and a handle
+DRAWER_VERTICES = 6
+HANDLE_VERTICES = conf.TRIANGLE_COUNT * 3
+
+
+class DrawerMesh:
+    """Vertex list containing all drawers followed by all handles, so handles
+    are always drawn on top of the drawers"""
+
+    def __init__(self, organizer, batch, groups):
+        self.organizer = organizer
+        drawers = organizer.drawers
+        # layout of each drawer in blocks: box position and size, drawer count
+        # and drawer index within its box
+        layout = []
+        for box in organizer.subelems:
+            for i in range(len(box.subelems)):
+                layout.append((box.x, box.y, box.w, box.h, len(box.subelems), i))
+        self.layout = np.array(layout, np.float64).reshape(-1, 6).T
+        # drawer numbers of the first drawer of each box
+        counts = [len(box.subelems) for box in organizer.subelems]
+        self.first = np.cumsum([0] + counts[:-1], dtype=np.int64)
+        # x, y, width and height of each drawer in pixels
+        self.rects = np.zeros((len(drawers), 4))
+        colors = list(conf.DRAWER_COLOR) * DRAWER_VERTICES * len(drawers)
+        colors += list(conf.HANDLE_COLOR) * HANDLE_VERTICES * len(drawers)
+        self.vertex_list = groups.shader.vertex_list(
+            len(colors) // 3,
+            GL_TRIANGLES,
+            batch,
+            groups.shadergroup,
+            colors=("Bn", colors),
+        )
+        for num, drawer in enumerate(drawers):
+            drawer.rect = DrawerRect(self, num)
+
+    def resize(self, x, y, block_size, bm, dm, hh, ht):
+        """Resize all drawers to a given organizer position and block size"""
+        bx, by, bw, bh, count, index = self.layout
+        # calculate drawer parameters, see BoxGUI.resize
+        box_x = bx * block_size + x
+        box_y = by * block_size + y
+        module_h = (bh * block_size - 2 * bm) / count
+        w = bw * block_size - 2 * (bm + dm)
+        h = module_h - 2 * dm
+        x = box_x + bm + dm
+        module_y = box_y + bm + dm
+        y = module_y + (count - 1 - index) * module_h
+        self.rects = np.stack((x, y, w, h), axis=1)
+        # store the module offsets of each box used for hit-testing, the
+        # modules include the drawer margin, see BoxGUI.resize
+        for box, box_y, box_h in zip(
+            self.organizer.subelems,
+            (module_y - dm)[self.first].tolist(),
+            module_h[self.first].tolist(),
+        ):
+            box.module_y = box_y
+            box.module_h = box_h
+        # calculate drawer and handle vertices, see DrawerGUI.resize
+        drawers = (x, y, x + w, y, x + w, y + h, x, y, x + w, y + h, x, y + h)
+        hw = w * conf.HANDLE_WIDTH
+        ox = x + (w - hw) / 2
+        handles = (
+            *(ox, y, ox + hh, y, ox + hh, y - hh),
+            *(ox + hh, y - hh, ox + hh, y, ox + hw - hh, y),
+            *(ox + hh, y - hh, ox + hw - hh, y, ox + hw - hh, y - hh),
+            *(ox + hw, y, ox + hw - hh, y, ox + hw - hh, y - hh),
+            *(ox, y, ox, y + ht, ox + hw, y),
+            *(ox + hw, y, ox, y + ht, ox + hw, y + ht),
+        )
+        positions = np.ctypeslib.as_array(self.vertex_list.position)
+        split = len(x) * DRAWER_VERTICES * 2
+        positions[:split] = np.stack(np.broadcast_arrays(*drawers), axis=1).ravel()
+        positions[split:] = np.stack(np.broadcast_arrays(*handles), axis=1).ravel()
+
+    def set_colors(self, masks):
+        """Set the colors of drawers and handles to the given color masks (dict
+        of drawer number -> color mask) with a single buffer write"""
+        if not masks:
+            return
+        nums = np.fromiter(masks, np.int64, len(masks))[:, np.newaxis]
+        masks = np.array(list(masks.values()))[:, np.newaxis]
+        colors = np.ctypeslib.as_array(self.vertex_list.colors).reshape(-1, 3)
+        drawers = nums * DRAWER_VERTICES + np.arange(DRAWER_VERTICES)
+        colors[drawers] = np.array(conf.DRAWER_COLOR) + masks
+        handles = len(self.rects) * DRAWER_VERTICES + nums * HANDLE_VERTICES
+        handles = handles + np.arange(HANDLE_VERTICES)
+        colors[handles] = np.array(conf.HANDLE_COLOR) + masks
+
+
+class DrawerRect:
+    """Rectangle of a drawer within the mesh, replaces its Rectangle"""
+
+    def __init__(self, mesh, num):
+        self.mesh = mesh
+        self.num = num
+
+    @property
+    def x(self):
+        return float(self.mesh.rects[self.num, 0])
+
+    @property
+    def y(self):
+        return float(self.mesh.rects[self.num, 1])
+
+    @property
+    def width(self):
+        return float(self.mesh.rects[self.num, 2])
+
+    @property
+    def height(self):
+        return float(self.mesh.rects[self.num, 3])
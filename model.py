@@ -1,11 +1,34 @@
+import gc
+import itertools
 import json
+import operator
+import os
+import re
+import sys
+import threading
+import time
 
+import profiling
 import settings as conf
 
+# lock guarding modifications and searches, allows searching from other threads
+lock = threading.RLock()
+
+# characters escaped in json strings, besides non-ascii and control characters
+ESCAPED = frozenset('"\\/')
+# items array of a drawer in the json database file, skipped on lazy loading,
+# possessive quantifiers never backtrack, so arrays containing nested arrays
+# fail to match in linear time
+ITEMS_PATTERN = re.compile(
+    rb'"items"\s*:\s*(\[(?:[^\[\]"]++|"(?:[^"\\]++|\\.)*+")*+\])'
+)
+
 
 class Element:
     """Base class for all elements containing subelements"""
 
+    __slots__ = ("subelems",)
+
     subelem_name = ""
 
     def __init__(self, subelems):
@@ -28,17 +51,325 @@ class Element:
 class Organizer(Element):
     """Organizer, contains boxes"""
 
+    __slots__ = (
+        "w",
+        "h",
+        "drawers",
+        "grid",
+        "neighbours",
+        "pending",
+        "source",
+        "index",
+        "fuzzy",
+        "journal",
+        "database",
+        "save_lock",
+        "generation",
+        "saved",
+        "files",
+        "model",
+    )
+
     subelem_name = "boxes"
 
-    def __init__(self, boxes, width, height):
+    def __init__(self, boxes, width, height, model=None, index=None):
         super().__init__(boxes)
         self.w = width
         self.h = height
+        # list of all drawers, their position is used as drawer number
+        self.drawers = [drawer for box in boxes for drawer in box.subelems]
+        # grid of blocks referencing the box they belong to, accessed by [y][x]
+        self.grid = [[None] * width for _ in range(height)]
+        for box in boxes:
+            blocks = [box] * box.w
+            for row in self.grid[box.y : box.y + box.h]:
+                row[box.x : box.x + box.w] = blocks
+        # neighbouring drawers of each drawer, determined on first navigation
+        self.neighbours = None
+        # create search index and journal, or share those of the given model
+        if model is None:
+            model = self
+            # drawer number -> position of the json array of items not loaded
+            # yet within the source file
+            self.pending = {}
+            self.source = None
+            if index is None:
+                index = self.__create_index(boxes)
+            self.index = index
+            self.fuzzy = Fuzzy(self.drawers) if conf.FUZZY_SEARCH else None
+            self.journal = None
+            self.database = None
+            self.save_lock = threading.Lock()
+            # incremented on every modification, compared to the saved one
+            self.generation = 0
+            self.saved = 0
+            self.files = Files()
+        else:
+            self.index = model.index
+            self.fuzzy = model.fuzzy
+        # organizer holding the data
+        self.model = model
+        # drawers report their modifications to the model
+        for num, drawer in enumerate(self.drawers):
+            drawer.organizer = model
+            drawer.num = num
+
+    def __create_index(self, boxes):
+        """Create the search index configured in the settings"""
+        if conf.SEARCH_INDEX == "columns":
+            import columns
+
+            return columns.Columns(boxes)
+        if conf.SEARCH_INDEX == "none":
+            return Scan()
+        return Index(self.drawers)
+
+    def __link(self, box):
+        """Determine the neighbours in each direction of all drawers of a box"""
+        drawers = box.subelems
+        above = self.get_box(box.x, box.y + box.h)
+        below = self.get_box(box.x, box.y - 1)
+        left = self.get_box(box.x - 1, box.y)
+        right = self.get_box(box.x + box.w, box.y)
+        for i, drawer in enumerate(drawers):
+            neighbours = dict.fromkeys(("up", "down", "left", "right"))
+            if i > 0:
+                neighbours["up"] = drawers[i - 1]
+            elif above is not None:
+                neighbours["up"] = above.subelems[-1]
+            if i < len(drawers) - 1:
+                neighbours["down"] = drawers[i + 1]
+            elif below is not None:
+                neighbours["down"] = below.subelems[0]
+            for direction, new_box in (("left", left), ("right", right)):
+                if new_box is not None:
+                    index = i * len(new_box.subelems) // len(drawers)
+                    neighbours[direction] = new_box.subelems[index]
+            self.neighbours[drawer] = neighbours
+
+    def get_box(self, x, y):
+        """Return the box at a given block coordinate"""
+        if 0 <= x < self.w and 0 <= y < self.h:
+            return self.grid[y][x]
+        return None
+
+    def get_neighbour(self, drawer, direction):
+        """Return the neighbour of a drawer in a direction (up, down, left or
+        right), None if there is none"""
+        if self.neighbours is None:
+            self.neighbours = {}
+            for box in self.subelems:
+                self.__link(box)
+        return self.neighbours[drawer][direction]
+
+    def jump(self, drawer, n):
+        """Return the drawer n drawers after (or before if n is negative) the
+        given one, limited to the first and last drawer"""
+        num = min(max(drawer.num + n, 0), len(self.drawers) - 1)
+        return self.drawers[num]
+
+    @profiling.profile("Organizer.find")
+    def find(self, str):
+        """Return all drawers together with their items containing str"""
+        if isinstance(self.index, Scan):
+            # only the items which are checked have to be loaded
+            self.load_matching(str)
+        else:
+            self.load_all()
+        with lock:
+            found = self.index.find(str)
+            if found is None:
+                # all items are candidates
+                if conf.PROFILING:
+                    count = sum(len(drawer.subelems) for drawer in self.drawers)
+                    profiling.note("search candidates", count)
+                return super().find(str)
+        return [(self.drawers[num], items) for num, items in found]
+
+    def find_fuzzy(self, str):
+        """Return all drawers together with their items containing str,
+        followed by items with words similar to the elems of str, best
+        matches first"""
+        found = self.find(str)
+        if self.fuzzy is None:
+            return found
+        with lock:
+            similar = self.fuzzy.find(str)
+        return found + [(self.drawers[num], [item]) for num, item in similar]
+
+    def add_items(self, items):
+        """Add (drawer, name, amount) tuples at once, the search indices are
+        updated after all of them were added, return the added items"""
+        model = self.model
+        added = []
+        with lock:
+            for drawer, name, amount in items:
+                drawer.load()
+                item = Item(name, amount)
+                drawer.subelems.append(item)
+                added.append((drawer.num, item))
+                model.log("add", drawer.num, name, amount)
+            for num, item in added:
+                self.add_to_index(num, item)
+        return [item for num, item in added]
+
+    def add_to_index(self, num, item):
+        """Add an item contained in the drawer with the given number to the
+        search indices"""
+        self.index.add(num, item)
+        if self.fuzzy is not None:
+            self.fuzzy.add(num, item)
+
+    def remove_from_index(self, item):
+        """Remove an item from the search indices"""
+        self.index.remove(item)
+        if self.fuzzy is not None:
+            self.fuzzy.remove(item)
 
+    def log(self, *record):
+        """Append a modification to the journal, compact it in the background
+        if it grew too large"""
+        self.generation += 1
+        if self.journal is not None:
+            self.journal.append(record)
+            if self.journal.size > conf.JOURNAL_MAX_SIZE:
+                if self.save_lock.acquire(blocking=False):
+                    self.save_lock.release()
+                    threading.Thread(target=self.save).start()
+
+    def replay(self, record):
+        """Apply a modification read from the journal"""
+        op, num, *args = record
+        drawer = self.drawers[num]
+        if op == "add":
+            drawer.add_item(*args)
+        elif op == "rename":
+            drawer.rename_item(*args)
+        elif op == "remove":
+            drawer.remove_item(*args)
+        elif op == "amount":
+            drawer.set_amount(*args)
+
+    def sync(self):
+        """Flush journaled modifications to disk, needed if syncing each of
+        them is deferred by the journal"""
+        if self.journal is not None:
+            with lock:
+                self.journal.sync()
+
+    def is_dirty(self):
+        """Test if the organizer was modified since it was last saved"""
+        return self.generation != self.saved
+
+    @profiling.profile("Organizer.save")
     def save(self):
-        """Save the organizer and its content to disk"""
-        with open(conf.ORGANIZER_JSON, "w") as f:
-            json.dump(self.asdict(), f, indent=conf.ORGANIZER_JSON_INDENT)
+        """Save the organizer and its content to disk if it was modified,
+        start a new journal"""
+        self.load_all()
+        with self.save_lock:
+            with lock:
+                if not self.is_dirty():
+                    return
+                generation = self.generation
+                # modifications are already stored in the database
+                if self.database is not None:
+                    self.saved = generation
+                    return
+                dct = self.asdict()
+                if self.journal is not None:
+                    dct["seq"] = self.journal.seq
+                    self.journal.rotate()
+            # write to a temporary file first to never leave a truncated file
+            tmp = self.files.json + ".tmp"
+            with open(tmp, "w") as f:
+                json.dump(dct, f, indent=conf.ORGANIZER_JSON_INDENT)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.files.json)
+            self.saved = generation
+            # the rotated journal is contained in the saved organizer now
+            try:
+                os.remove(self.files.journal + ".old")
+            except FileNotFoundError:
+                pass
+
+    def load_items(self, num):
+        """Load the items of the drawer with the given number if pending"""
+        with lock:
+            span = self.model.pending.pop(num, None)
+            if span is not None:
+                source = self.model.source
+                source.seek(span[0])
+                items = json.loads(source.read(span[1] - span[0]))
+                if not self.model.pending:
+                    source.close()
+                drawer = self.drawers[num]
+                for item in items:
+                    item = Item.fromdict(item)
+                    drawer.subelems.append(item)
+                    self.add_to_index(num, item)
+
+    def peek_items(self, num):
+        """Return the items of the drawer with the given number, parse them
+        without loading them into the drawer if pending, so iterating over all
+        drawers doesn't load the whole organizer"""
+        with lock:
+            span = self.model.pending.get(num)
+            if span is None:
+                return list(self.drawers[num].subelems)
+            source = self.model.source
+            source.seek(span[0])
+            items = json.loads(source.read(span[1] - span[0]))
+        return [Item.fromdict(item) for item in items]
+
+    def load_all(self):
+        """Load the items of all drawers which are still pending"""
+        for num in list(self.model.pending):
+            self.load_items(num)
+
+    def load_matching(self, str):
+        """Load the items of all pending drawers whose json array contains all
+        elems of str, the items of the others can't contain them"""
+        # strings are contained unchanged in json arrays if they are plain ascii
+        for s in str:
+            if not (s.isascii() and s.isprintable() and ESCAPED.isdisjoint(s)):
+                return self.load_all()
+        terms = [s.encode() for s in str]
+        with lock:
+            if not self.model.pending:
+                return
+            source = self.model.source
+            source.seek(0)
+            text = source.read()
+            plain = text.isascii() and b"\\u" not in text
+            lower = text.lower()
+            if plain and not all(term in lower for term in terms):
+                return
+            for num, (start, end) in list(self.model.pending.items()):
+                if not plain:
+                    items = text[start:end]
+                    if not items.isascii() or b"\\u" in items:
+                        self.load_items(num)
+                        continue
+                if all(lower.find(term, start, end) >= 0 for term in terms):
+                    self.load_items(num)
+
+    def start_loading(self):
+        """Load the items of all pending drawers in the background"""
+        if self.model.pending:
+            threading.Thread(target=self.load_all, daemon=True).start()
+
+    def start_autosave(self):
+        """Periodically save the organizer in the background if modified"""
+
+        def autosave():
+            while True:
+                time.sleep(conf.AUTOSAVE_INTERVAL)
+                if self.is_dirty():
+                    self.save()
+
+        if conf.AUTOSAVE_INTERVAL > 0:
+            threading.Thread(target=autosave, daemon=True).start()
 
     def asdict(self):
         dct = {"width": self.w, "height": self.h}
@@ -53,75 +384,195 @@ class Organizer(Element):
         return Organizer(boxes, dct["width"], dct["height"])
 
     @classmethod
-    def load(cls):
-        """Load the organizer and its content from disk"""
+    def load(cls, files=None):
+        """Load the organizer and its content from disk, from the files given
+        in the settings if no others are given"""
+        if files is None:
+            files = Files()
+        if conf.STORAGE_BACKEND == "sqlite":
+            import database
+
+            return database.load(files)
+        organizer, seq = cls.read(files)
+        organizer.journal = Journal(files.journal, seq)
+        return organizer
+
+    @classmethod
+    def read(cls, files=None):
+        """Read the organizer from the json database file and the journal, or
+        from the config file if there is none, return it together with the
+        sequence number of the last applied journal record"""
+        if files is None:
+            files = Files()
         try:
-            with open(conf.ORGANIZER_JSON) as f:
-                dct = json.load(f)
-            organizer = Organizer.fromdict(dct)
+            if conf.LAZY_LOAD:
+                organizer, dct = cls.__parse_lazy(files.json)
+            else:
+                with open(files.json) as f:
+                    dct = json.loads(f.read())
+                organizer = Organizer.fromdict(dct)
+            seq = dct.get("seq", 0)
         except FileNotFoundError:
-            organizer = cls.__parse_config()
-        return organizer
+            organizer = cls.__parse_config(files.conf)
+            organizer.saved = -1
+            seq = 0
+        organizer.files = files
+        # replay modifications not contained in the saved organizer
+        for path in (files.journal + ".old", files.journal):
+            for record in Journal.read(path):
+                if record[0] > seq:
+                    seq = record[0]
+                    organizer.replay(record[1:])
+        return organizer, seq
 
     @classmethod
-    def __parse_config(cls):
-        """Parse the organizer structure from config file"""
-        boxes = []
-        w = 0
-        h = 0
+    def __parse_lazy(cls, path):
+        """Parse the organizer structure from the json database file, keep the
+        position of the items of each drawer within it to parse them on demand,
+        structure and positions are cached until the file changes"""
+        source = open(path, "rb")
+        stat = os.fstat(source.fileno())
+        key = [stat.st_size, stat.st_mtime_ns]
+        try:
+            with open(path + ".lazy") as f:
+                cache = json.load(f)
+            if cache["key"] != key:
+                raise ValueError("outdated cache")
+        except (OSError, ValueError, KeyError):
+            text = source.read()
+            # drawer number, start and end of all non-empty item arrays
+            spans = []
+            count = 0
+
+            def skip(match):
+                nonlocal count
+                if match.group(1).strip(b"[ \n]"):
+                    spans.extend((count, *match.span(1)))
+                count += 1
+                return b'"items": []'
+
+            dct = json.loads(ITEMS_PATTERN.sub(skip, text))
+            if count != sum(len(box["drawers"]) for box in dct["boxes"]):
+                # unexpected structure, parse everything
+                source.close()
+                dct = json.loads(text)
+                return Organizer.fromdict(dct), dct
+            # store the structure compactly as x, y, w, h and drawer count
+            boxes = []
+            for box in dct["boxes"]:
+                boxes.extend((box["x"], box["y"], box["w"], box["h"]))
+                boxes.append(len(box["drawers"]))
+            cache = {
+                "key": key,
+                "width": dct["width"],
+                "height": dct["height"],
+                "seq": dct.get("seq", 0),
+                "boxes": boxes,
+                "spans": spans,
+            }
+            try:
+                with open(path + ".lazy", "w") as f:
+                    json.dump(cache, f)
+            except OSError:
+                pass
+        boxes = cache["boxes"]
+        organizer = Organizer(
+            [
+                Box([Drawer([]) for _ in range(n)], x, y, w, h)
+                for x, y, w, h, n in zip(*[iter(boxes)] * 5)
+            ],
+            cache["width"],
+            cache["height"],
+        )
+        spans = iter(cache["spans"])
+        for num, start, end in zip(spans, spans, spans):
+            organizer.pending[num] = (start, end)
+        if organizer.pending:
+            organizer.source = source
+        else:
+            source.close()
+        return organizer, cache
+
+    @classmethod
+    def __parse_config(cls, path):
+        """Parse the organizer structure from a config file, raise a ValueError
+        describing all invalid lines and boxes"""
         symbols = {}
         layout = []
+        numbers = []
+        errors = []
         # read conf file
-        with open(conf.ORGANIZER_CONF) as conf_file:
+        with open(path) as conf_file:
             lines = conf_file.read().splitlines()
         # parse drawer count and box layout to symbol dict and layout array
-        for line in lines:
-            if len(line) > 2 and line[0] != "#":
-                if ":" in line:
-                    s = line.split(":")
-                    symbols[s[0]] = s[1]
-                else:
-                    layout.append(line.split(" "))
-                    w = max(w, len(layout[-1]))
-                    h += 1
-        # create boxes from layout
-        org_w = len(layout[0])
+        for n, line in enumerate(lines, 1):
+            if line.strip() == "" or line[0] == "#":
+                continue
+            if ":" in line:
+                s, count = line.split(":", 1)
+                if not count.strip().isdigit():
+                    errors.append(f"line {n}: invalid drawer count for {s}")
+                elif symbols.setdefault(s, int(count)) != int(count):
+                    errors.append(f"line {n}: conflicting drawer count for {s}")
+            else:
+                layout.append(line.split(" "))
+                numbers.append(n)
+        if layout == []:
+            errors.append("no layout defined")
+        # create boxes from the connected blocks of equal symbols
+        org_w = max((len(line) for line in layout), default=0)
         org_h = len(layout)
-        for i, line in enumerate(layout):
-            j = 0
-            while j < org_w:
-                s = c = line[j]
-                if c == "":
-                    j += 1
-                else:
-                    w = 0
-                    h = 0
-                    x = j
-                    # create correct amount of drawers depending on symbol
-                    drawers = []
-                    for k in range(int(symbols[s])):
-                        drawers.append(Drawer([]))
-                    # determine box width
-                    while c == s and j < org_w:
-                        j += 1
-                        w += 1
-                        if j < org_w:
-                            c = line[j]
-                    # determine box height and flag array entries to be ignored
-                    c = s
-                    while c == s and i + h < org_h:
-                        for k in range(w):
-                            layout[i + h][x + k] = ""
-                        h += 1
-                        if i + h < org_h:
-                            c = layout[i + h][x]
+        boxes = []
+        # all created objects are kept, collecting garbage in between only
+        # takes time for large layouts
+        enabled = gc.isenabled()
+        gc.disable()
+        try:
+            for s, x, i, w, h, blocks in Layout(layout).boxes():
+                if s in symbols and blocks == w * h:
+                    drawers = [Drawer([]) for _ in range(symbols[s])]
                     boxes.append(Box(drawers, x, org_h - i - h, w, h))
-        return Organizer(boxes, org_w, org_h)
+                    continue
+                position = f"line {numbers[i]}, column {x + 1}"
+                if s not in symbols:
+                    errors.append(f"{position}: no drawer count defined for {s}")
+                else:
+                    errors.append(
+                        f"{position}: box {s} spanning lines {numbers[i]}-"
+                        f"{numbers[i + h - 1]}, columns {x + 1}-{x + w} "
+                        "is not rectangular"
+                    )
+            if errors != []:
+                raise ValueError(f"invalid {path}:\n" + "\n".join(errors))
+            return Organizer(boxes, org_w, org_h)
+        finally:
+            if enabled:
+                gc.enable()
+
+
+class Files:
+    """Paths of the files of an organizer, either those given in the settings
+    or files with the same names within a given directory"""
+
+    __slots__ = ("conf", "json", "journal", "db")
+
+    def __init__(self, directory=None):
+        paths = [
+            conf.ORGANIZER_CONF,
+            conf.ORGANIZER_JSON,
+            conf.ORGANIZER_JOURNAL,
+            conf.ORGANIZER_DB,
+        ]
+        if directory is not None:
+            paths = [os.path.join(directory, os.path.basename(p)) for p in paths]
+        self.conf, self.json, self.journal, self.db = paths
 
 
 class Box(Element):
     """Box, contains drawers"""
 
+    __slots__ = ("x", "y", "w", "h")
+
     subelem_name = "drawers"
 
     def __init__(self, drawers, x, y, w, h):
@@ -147,10 +598,76 @@ class Box(Element):
 class Drawer(Element):
     """Drawer, can countain multiple Items"""
 
+    __slots__ = ("organizer", "num")
+
     subelem_name = "items"
 
     def __init__(self, items=[]):
         super().__init__(items)
+        self.organizer = None
+        self.num = 0
+
+    def find(self, str):
+        """Return all items containting str together with the drawer"""
+        items = []
+        for item in self.subelems:
+            items += item.find(str)
+        if items != []:
+            return [(self, items)]
+        return []
+
+    def add_item(self, name, amount=None):
+        """Add an item to the drawer"""
+        self.load()
+        item = Item(name, amount)
+        with lock:
+            self.subelems.append(item)
+            if self.organizer is not None:
+                self.organizer.add_to_index(self.num, item)
+                self.organizer.log("add", self.num, name, amount)
+
+    def rename_item(self, num, name):
+        """Rename the item with the given list index"""
+        self.load()
+        item = self.subelems[num]
+        with lock:
+            if self.organizer is not None:
+                self.organizer.remove_from_index(item)
+            item.rename(name)
+            if self.organizer is not None:
+                self.organizer.add_to_index(self.num, item)
+                self.organizer.log("rename", self.num, num, name)
+
+    def remove_item(self, num):
+        """Remove the item with the given list index"""
+        self.load()
+        with lock:
+            item = self.subelems.pop(num)
+            if self.organizer is not None:
+                self.organizer.remove_from_index(item)
+                self.organizer.log("remove", self.num, num)
+
+    def set_amount(self, num, amount):
+        """Set the amount of the item with the given list index"""
+        self.load()
+        item = self.subelems[num]
+        with lock:
+            item.amount = amount
+            if self.organizer is not None:
+                # update the item in the indices as well, they might store amounts
+                self.organizer.remove_from_index(item)
+                self.organizer.add_to_index(self.num, item)
+                self.organizer.log("amount", self.num, num, amount)
+
+    def get_items(self):
+        """Return all items of the drawer"""
+        self.load()
+        return self.subelems
+
+    def load(self):
+        """Load the items of the drawer if they have not been loaded yet"""
+        if self.organizer is not None and self.organizer.pending:
+            self.organizer.load_items(self.num)
 
     @classmethod
     def fromdict(cls, dct):
@@ -163,10 +680,18 @@ class Drawer(Element):
 class Item:
     """Item, has a name and can have an amount"""
 
+    __slots__ = ("name", "amount", "lower")
+
     def __init__(self, name, amount=None):
-        self.name = name
         self.amount = amount
-        self.lower = self.name.lower()
+        self.rename(name)
+
+    def rename(self, name):
+        """Set the name, share equal names and their lowercase version between
+        items by interning them"""
+        self.name = sys.intern(name)
+        lower = name.lower()
+        self.lower = self.name if lower == name else sys.intern(lower)
 
     def find(self, str):
         """Return [self] if all elems of str is contained in name, else []"""
@@ -178,6 +703,421 @@ class Item:
     def asdict(self):
         return {"name": self.name, "amount": self.amount}
 
+    @staticmethod
+    def is_amount(amount):
+        """Return whether a value given by a user is a valid amount, a number
+        or None"""
+        return amount is None or (
+            isinstance(amount, (int, float)) and not isinstance(amount, bool)
+        )
+
     @classmethod
     def fromdict(cls, dct):
         return Item(dct["name"], dct["amount"])
+
+
+class Layout:
+    """Connected blocks of equal symbols within a layout, labeled using
+    union-find on the runs of equal symbols, runs repeated in the following
+    rows are extended downwards instead of adding new ones"""
+
+    def __init__(self, layout):
+        # symbol, first row, start, end and last row of each run
+        self.runs = []
+        self.parent = []
+        prev = []
+        # run of each column of the previous row
+        prev_ids = []
+        for i, row in enumerate(layout):
+            if i > 0 and row == layout[i - 1]:
+                for run in prev:
+                    self.runs[run][4] = i
+                continue
+            # start of each run at the first block and every change of symbol
+            changes = itertools.compress(
+                range(1, len(row)), map(operator.ne, row[1:], row)
+            )
+            starts = [0, *changes] if row != [] else []
+            current = []
+            ids = []
+            for start, end in zip(starts, starts[1:] + [len(row)]):
+                if row[start] != "":
+                    run = len(self.runs)
+                    current.append(run)
+                    self.parent.append(run)
+                    self.runs.append([row[start], i, start, end, i])
+                else:
+                    run = -1
+                ids += itertools.repeat(run, end - start)
+            # join the runs of adjacent rows sharing a column with equal
+            # symbols, each pair of runs once, empty blocks have no run
+            if i > 0:
+                equal = map(operator.eq, row, layout[i - 1])
+                for a, b in set(itertools.compress(zip(prev_ids, ids), equal)):
+                    if b >= 0:
+                        self.union(a, b)
+            prev = current
+            prev_ids = ids
+
+    def find(self, run):
+        """Return the representative run of the component of a run"""
+        parent = self.parent
+        while parent[run] != run:
+            parent[run] = parent[parent[run]]
+            run = parent[run]
+        return run
+
+    def union(self, a, b):
+        """Join the components of two runs"""
+        a = self.find(a)
+        b = self.find(b)
+        if a != b:
+            self.parent[max(a, b)] = min(a, b)
+
+    def boxes(self):
+        """Return symbol, left column, top row, width, height and block count
+        of each component, ordered by their first block"""
+        runs = self.runs
+        # extent of the components consisting of several runs by their first
+        # run, all other runs are components on their own
+        joined = {}
+        for run, root in enumerate(self.parent):
+            if root != run:
+                root = self.find(run)
+                s, i, start, end, last = runs[run]
+                box = joined.get(root)
+                if box is None:
+                    first = runs[root]
+                    box = joined[root] = [*first[2:], first[3] - first[2]]
+                    box[3] *= first[4] - first[1] + 1
+                box[0] = min(box[0], start)
+                box[1] = max(box[1], end)
+                box[2] = max(box[2], last)
+                box[3] += (end - start) * (last - i + 1)
+        boxes = []
+        for run, (s, i, start, end, last) in enumerate(runs):
+            if run in joined:
+                start, end, last, blocks = joined[run]
+            elif self.parent[run] != run:
+                continue
+            else:
+                blocks = (end - start) * (last - i + 1)
+            boxes.append((s, start, i, end - start, last - i + 1, blocks))
+        return boxes
+
+
+class Journal:
+    """Append-only log of modifications, each record is a line containing a
+    JSON array starting with a sequence number"""
+
+    def __init__(self, path, seq=0):
+        self.path = path
+        self.seq = seq
+        # opened on the first append, so only reading creates no file
+        self.file = None
+        try:
+            self.size = os.path.getsize(path)
+        except FileNotFoundError:
+            self.size = 0
+        # records are only flushed to disk by sync if set, to write batches
+        self.deferred = False
+
+    def open(self):
+        """Open the journal for appending"""
+        # drop a record truncated by a crash while appending
+        try:
+            with open(self.path, "rb+") as f:
+                data = f.read()
+                if not data.endswith(b"\n"):
+                    f.truncate(data.rfind(b"\n") + 1)
+        except FileNotFoundError:
+            pass
+        self.file = open(self.path, "a")
+        self.size = self.file.tell()
+
+    def append(self, record):
+        """Append a record and flush it to disk unless syncing is deferred"""
+        if self.file is None:
+            self.open()
+        self.seq += 1
+        line = json.dumps([self.seq, *record], separators=(",", ":")) + "\n"
+        self.file.write(line)
+        self.size += len(line)
+        if not self.deferred:
+            self.sync()
+
+    def sync(self):
+        """Flush all appended records to disk"""
+        if self.file is not None:
+            self.file.flush()
+            os.fsync(self.file.fileno())
+
+    def close(self):
+        """Flush all appended records and close the file"""
+        if self.file is not None:
+            self.sync()
+            self.file.close()
+            self.file = None
+
+    def rotate(self):
+        """Move the journal aside, a new one is started on the next append"""
+        self.close()
+        try:
+            os.replace(self.path, self.path + ".old")
+        except FileNotFoundError:
+            pass
+        self.size = 0
+
+    @staticmethod
+    def read(path):
+        """Yield all records of a journal file, stop at a truncated record"""
+        try:
+            with open(path) as f:
+                for line in f:
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        return
+        except FileNotFoundError:
+            pass
+
+
+class Index:
+    """Trigram index over the items of all drawers, used to narrow down
+    the items which have to be checked on search"""
+
+    def __init__(self, drawers):
+        # item lists of all drawers, accessed by drawer number
+        self.items = [drawer.subelems for drawer in drawers]
+        # trigram -> set of items containing it
+        self.postings = {}
+        # item -> number of the drawer containing it
+        self.nums = {}
+        # incremented on every change, used to invalidate search results
+        self.version = 0
+        for num, items in enumerate(self.items):
+            for item in items:
+                self.add(num, item)
+
+    @staticmethod
+    def trigrams(str):
+        """Return the set of all trigrams of str"""
+        return {str[i : i + 3] for i in range(len(str) - 2)}
+
+    def add(self, num, item):
+        """Add an item contained in the drawer with the given number"""
+        self.nums[item] = num
+        self.version += 1
+        for trigram in self.trigrams(item.lower):
+            self.postings.setdefault(trigram, set()).add(item)
+
+    def remove(self, item):
+        """Remove an item from the index"""
+        del self.nums[item]
+        self.version += 1
+        for trigram in self.trigrams(item.lower):
+            posting = self.postings[trigram]
+            posting.discard(item)
+            if not posting:
+                del self.postings[trigram]
+
+    def find(self, str):
+        """Return (drawer number, items) of all items containing all elems
+        of str, None if str is too short to be looked up in the index"""
+        trigrams = set()
+        for s in str:
+            trigrams |= self.trigrams(s)
+        if not trigrams:
+            return None
+        # intersect posting lists, starting with the smallest one
+        postings = []
+        for trigram in trigrams:
+            posting = self.postings.get(trigram)
+            if not posting:
+                profiling.note("search candidates", 0)
+                return []
+            postings.append(posting)
+        postings.sort(key=len)
+        matches = postings[0].intersection(*postings[1:])
+        profiling.note("search candidates", len(matches))
+        # candidates only contain the terms for sure if they are trigrams
+        if any(len(s) != 3 for s in str):
+            matches = {item for item in matches if item.find(str)}
+        # restore the order of drawers and items within each drawer
+        nums = {self.nums[item] for item in matches}
+        items = self.items
+        return [
+            (num, [i for i in items[num] if i in matches]) for num in sorted(nums)
+        ]
+
+
+class Scan:
+    """Replacement of the search index checking all items on every search,
+    saves building an index if only searching once"""
+
+    def __init__(self):
+        self.version = 0
+
+    def add(self, num, item):
+        self.version += 1
+
+    def remove(self, item):
+        self.version += 1
+
+    def find(self, str):
+        """Return None, all items have to be checked"""
+        return None
+
+
+class Fuzzy:
+    """BK-tree over the words of all item names, used to find items with words
+    similar to the search terms without comparing them to every word"""
+
+    # amount of characters of a search term per tolerated edit
+    chars_per_edit = 4
+
+    def __init__(self, drawers):
+        # nodes are tuples of a word and a dict of distance -> child node
+        self.root = None
+        # item lists of all drawers, accessed by drawer number
+        self.items = [drawer.subelems for drawer in drawers]
+        # word -> set of items containing it
+        self.words = {}
+        # item -> number of the drawer containing it
+        self.nums = {}
+        for num, items in enumerate(self.items):
+            for item in items:
+                self.add(num, item)
+
+    @staticmethod
+    def distance(a, b):
+        """Return the edit distance between a and b"""
+        prev = list(range(len(b) + 1))
+        for i, ca in enumerate(a, 1):
+            cur = [i]
+            for j, cb in enumerate(b, 1):
+                cur.append(min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (ca != cb)))
+            prev = cur
+        return prev[-1]
+
+    def add(self, num, item):
+        """Add an item contained in the drawer with the given number"""
+        self.nums[item] = num
+        for word in set(item.lower.split()):
+            if word not in self.words:
+                self.words[word] = set()
+                self.__insert(word)
+            self.words[word].add(item)
+
+    def remove(self, item):
+        """Remove an item, its words are kept in the tree"""
+        del self.nums[item]
+        for word in set(item.lower.split()):
+            self.words[word].discard(item)
+
+    def __insert(self, word):
+        """Insert a word into the tree"""
+        if self.root is None:
+            self.root = (word, {})
+            return
+        node = self.root
+        while True:
+            d = self.distance(word, node[0])
+            if d not in node[1]:
+                node[1][d] = (word, {})
+                return
+            node = node[1][d]
+
+    def similar(self, term):
+        """Return word -> distance of all words similar to term"""
+        tolerance = len(term) // self.chars_per_edit
+        similar = {}
+        if tolerance == 0 or self.root is None:
+            return similar
+        nodes = [self.root]
+        while nodes:
+            word, children = nodes.pop()
+            d = self.distance(term, word)
+            if d <= tolerance:
+                similar[word] = d
+            for k, child in children.items():
+                if d - tolerance <= k <= d + tolerance:
+                    nodes.append(child)
+        return similar
+
+    def find(self, str):
+        """Return (drawer number, item) of all items having a word similar to
+        at least one elem of str and containing or having a word similar to
+        all others, sorted by the sum of distances, exact matches excluded"""
+        similar = [self.similar(s) for s in str]
+        candidates = set()
+        for words in similar:
+            for word, d in words.items():
+                if d > 0:
+                    candidates |= self.words[word]
+        # (sum of distances, drawer number) -> set of items
+        ranked = {}
+        for item in candidates:
+            score = 0
+            for s, words in zip(str, similar):
+                if s in item.lower:
+                    continue
+                distances = [words[w] for w in item.lower.split() if w in words]
+                if not distances:
+                    break
+                score += min(distances)
+            else:
+                if score > 0:
+                    ranked.setdefault((score, self.nums[item]), set()).add(item)
+        # keep the order of items within each drawer for equal distances
+        result = []
+        for score, num in sorted(ranked):
+            matches = ranked[score, num]
+            result += [(num, i) for i in self.items[num] if i in matches]
+        return result
+
+
+class Search:
+    """Incremental search session, narrows down the previous results instead
+    of searching the whole organizer if the search terms are refined"""
+
+    def __init__(self, organizer):
+        self.organizer = organizer
+        self.reset()
+
+    def reset(self):
+        """Forget the previous search results"""
+        self.terms = None
+        self.found = []
+        self.version = None
+
+    def refines(self, str):
+        """Test if every previous term is contained in one of the terms of str,
+        all results for str are then part of the previous results"""
+        for term in self.terms:
+            if not any(term in s for s in str):
+                return False
+        return True
+
+    @profiling.profile("Search.find")
+    def find(self, str):
+        """Return all drawers together with their items containing str"""
+        with lock:
+            version = self.organizer.index.version
+            refined = self.terms is not None and self.version == version
+            # similar items can't be narrowed down by filtering exact matches
+            refined = refined and not conf.FUZZY_SEARCH
+            if refined and self.refines(str):
+                found = []
+                for drawer, items in self.found:
+                    items = [item for item in items if item.find(str)]
+                    if items != []:
+                        found.append((drawer, items))
+            elif conf.FUZZY_SEARCH:
+                found = self.organizer.find_fuzzy(str)
+            else:
+                found = self.organizer.find(str)
+        self.terms = str
+        self.found = found
+        self.version = version
+        return found
@@ -1,22 +1,78 @@
 #!/usr/bin/env python3
 
-from pyglet import app
-from pyglet.graphics import Batch, Group
+import argparse
 
-from gui import Groups, OrganizerGUI, OrganizerWindow
-from model import Organizer
+from startup import Startup
+
+
+def create_gui(window, batch, groups, opened):
+    """Load the organizer or cabinets and create the GUI step by step once the
+    window is shown, yields the name of the phase after each step, the loaded
+    organizer or cabinets are appended to opened"""
+    import settings as conf
+
+    if conf.CABINETS_DIR is not None:
+        from cabinets import Cabinets
+
+        # load cabinets when they are shown first
+        cabinets = Cabinets(conf.CABINETS_DIR)
+        opened.append(cabinets)
+        window.create_widgets()
+        yield "widgets"
+        window.set_cabinets(cabinets)
+        yield "cabinet"
+        return
+
+    from gui import OrganizerGUI
+    from model import Organizer
 
-if __name__ == "__main__":
-    # setup batch and groups
-    batch = Batch()
-    groups = Groups()
-    # create window
-    window = OrganizerWindow(batch, groups)
     # create organizer object
     organizer = Organizer.load()
-    organizer_gui = OrganizerGUI(organizer, batch, groups)
-    # set organizer for window and execute main program loop
+    organizer.start_autosave()
+    opened.append(organizer)
+    yield "organizer"
+    window.create_widgets()
+    yield "widgets"
+    groups.create_shader()
+    yield "shader"
+    # set organizer for window, create the drawers over the following frames
+    organizer_gui = OrganizerGUI(organizer, batch, groups, defer=True)
     window.set_organizer(organizer_gui)
-    app.run()
-    # save organizer at program exit
-    organizer.save()
+    yield "organizer gui"
+    while not organizer_gui.create_graphics(conf.STARTUP_DRAWERS):
+        yield "drawers"
+    yield "drawers"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="print the duration of each startup phase and of all imports",
+    )
+    args = parser.parse_args()
+    startup = Startup(args.profile_startup)
+
+    with startup.phase("imports"):
+        from pyglet import app
+        from pyglet.graphics import Batch
+
+        import settings as conf
+        from gui import Groups, OrganizerWindow
+    with startup.phase("window"):
+        # setup batch and groups
+        batch = Batch()
+        groups = Groups()
+        # create window
+        window = OrganizerWindow(batch, groups)
+    with startup.phase("first frame"):
+        window.draw(0)
+    opened = []
+    startup.run(window, create_gui(window, batch, groups, opened))
+    # execute main program loop, redraw on demand only if configured, otherwise
+    # at a fixed frame rate
+    app.run(None if conf.REDRAW_ON_DEMAND else 1 / 60)
+    # save organizer or cabinets at program exit
+    for organizer in opened:
+        organizer.save()
@@ -0,0 +1,99 @@
+"""Opt-in timing of hot code paths, collects call counts and histograms of the
+call durations and dumps them to a file at program exit"""
+
+import atexit
+import functools
+import json
+import time
+
+import settings as conf
+
+# statistics by name, values noted by name
+stats = {}
+values = {}
+
+
+class Stats:
+    """Call count, durations and histogram of durations with buckets of
+    powers of two microseconds"""
+
+    __slots__ = ("count", "total", "max", "last", "histogram")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+        self.max = 0
+        self.last = 0
+        self.histogram = {}
+
+    def add(self, duration):
+        self.count += 1
+        self.total += duration
+        self.max = max(self.max, duration)
+        self.last = duration
+        bucket = int(duration * 1e6).bit_length()
+        self.histogram[bucket] = self.histogram.get(bucket, 0) + 1
+
+    def asdict(self):
+        return {
+            "count": self.count,
+            "total": self.total,
+            "mean": self.total / self.count,
+            "max": self.max,
+            "last": self.last,
+            # upper bound of each bucket in microseconds
+            "histogram": {1 << b: n for b, n in sorted(self.histogram.items())},
+        }
+
+
+def profile(name):
+    """Decorator timing all calls of a function under a given name, returns
+    the function unchanged if profiling is disabled"""
+
+    def decorator(func):
+        if not conf.PROFILING:
+            return func
+        stat = stats[name] = Stats()
+
+        @functools.wraps(func)
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                stat.add(time.perf_counter() - start)
+
+        return timed
+
+    return decorator
+
+
+def note(name, value):
+    """Note the last value of a given name, e.g. a result count"""
+    if conf.PROFILING:
+        values[name] = value
+
+
+def summary():
+    """Return a short text with the last and mean duration of each timed path
+    as well as the noted values"""
+    lines = []
+    for name, stat in stats.items():
+        if stat.count > 0:
+            last = stat.last * 1000
+            mean = stat.total / stat.count * 1000
+            lines.append(f"{name}: {last:.2f} ms (mean {mean:.2f} ms, {stat.count}x)")
+    for name, value in values.items():
+        lines.append(f"{name}: {value}")
+    return "\n".join(lines)
+
+
+def dump():
+    """Write all statistics and noted values to the configured file"""
+    dct = {name: stat.asdict() for name, stat in stats.items() if stat.count > 0}
+    with open(conf.PROFILING_FILE, "w") as f:
+        json.dump({"stats": dct, "values": values}, f, indent=2)
+
+
+if conf.PROFILING and conf.PROFILING_FILE:
+    atexit.register(dump)
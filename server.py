@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+"""Serve one organizer to many clients over HTTP, requests and responses are
+JSON:
+
+    GET    /                                  size and drawer count
+    GET    /find?q=TERMS                      find items
+    GET    /drawers/DRAWER                    list the items of a drawer
+    POST   /drawers/DRAWER/items              add an item {"name", "amount"}
+    PATCH  /drawers/DRAWER/items/ITEM         rename or set amount
+    DELETE /drawers/DRAWER/items/ITEM         remove an item
+    POST   /drawers/DRAWER/items/ITEM/move    move an item {"drawer"}"""
+
+import argparse
+import asyncio
+import json
+import signal
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+import model
+import settings as conf
+
+
+class HTTPError(Exception):
+    """Request can't be served, reported with status and message"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class ReadWriteLock:
+    """Readers-writer lock for asyncio tasks, held by any amount of readers or
+    a single writer, new readers wait for waiting writers to not starve them"""
+
+    def __init__(self):
+        self.condition = asyncio.Condition()
+        self.readers = 0
+        self.writers = 0
+        self.writing = False
+
+    async def acquire_read(self):
+        async with self.condition:
+            await self.condition.wait_for(lambda: self.writers == 0)
+            self.readers += 1
+
+    async def release_read(self):
+        async with self.condition:
+            self.readers -= 1
+            if self.readers == 0:
+                self.condition.notify_all()
+
+    async def acquire_write(self):
+        async with self.condition:
+            self.writers += 1
+            await self.condition.wait_for(
+                lambda: self.readers == 0 and not self.writing
+            )
+            self.writing = True
+
+    async def release_write(self):
+        async with self.condition:
+            self.writers -= 1
+            self.writing = False
+            self.condition.notify_all()
+
+
+class Server:
+    """HTTP server owning an organizer, lookups are executed concurrently by
+    a thread pool, modifications are applied in batches by a single writer
+    and each batch is written to disk at once"""
+
+    def __init__(self, organizer):
+        self.organizer = organizer
+        self.lock = ReadWriteLock()
+        self.pool = ThreadPoolExecutor(conf.SERVER_THREADS)
+        # modifications waiting for the writer with their futures
+        self.queue = None
+        # the journal is synced once per batch instead of per modification
+        if organizer.journal is not None:
+            organizer.journal.deferred = True
+
+    async def serve(self, host, port):
+        """Accept connections until cancelled"""
+        self.queue = asyncio.Queue()
+        writer = asyncio.create_task(self.__write_batches())
+        server = await asyncio.start_server(self.__handle, host, port)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            writer.cancel()
+
+    async def __handle(self, reader, writer):
+        """Answer the requests of a connection, keep it open if possible"""
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                headers = {}
+                while True:
+                    header = await reader.readline()
+                    if header.strip() == b"":
+                        break
+                    name, _, value = header.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                try:
+                    method, target, version = line.decode("latin-1").split()
+                    length = int(headers.get("content-length", 0))
+                    body = await reader.readexactly(length)
+                    status, result = 200, await self.__dispatch(method, target, body)
+                except HTTPError as e:
+                    status, result = e.status, {"error": e.message}
+                except ValueError:
+                    status, result = 400, {"error": "malformed request"}
+                    version = "HTTP/1.0"
+                except Exception as e:
+                    status, result = 500, {"error": repr(e)}
+                keep_alive = version == "HTTP/1.1" and (
+                    headers.get("connection", "").lower() != "close"
+                )
+                data = json.dumps(result).encode()
+                head = [
+                    f"HTTP/1.1 {status} {HTTPStatus(status).phrase}",
+                    "Content-Type: application/json",
+                    f"Content-Length: {len(data)}",
+                ]
+                if not keep_alive:
+                    head.append("Connection: close")
+                writer.write(("\r\n".join(head) + "\r\n\r\n").encode() + data)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def __dispatch(self, method, target, body):
+        """Route a request to its handler, return the result"""
+        url = urlsplit(target)
+        path = url.path.strip("/").split("/")
+        try:
+            args = json.loads(body) if body else {}
+        except json.JSONDecodeError:
+            raise HTTPError(400, "body is no valid json")
+        if not isinstance(args, dict):
+            raise HTTPError(400, "body has to be an object")
+        if path == [""] and method == "GET":
+            return await self.read(self.info)
+        if path == ["find"] and method == "GET":
+            query = " ".join(parse_qs(url.query).get("q", []))
+            terms = query.lower().split()
+            if not terms:
+                raise HTTPError(400, "no search terms")
+            return await self.read(self.find, terms)
+        if len(path) >= 2 and path[0] == "drawers":
+            nums = [self.number(s) for s in path[1:2] + path[3:4]]
+            route = (method, len(path), path[2:3], path[4:])
+            if route == ("GET", 2, [], []):
+                return await self.read(self.ls, *nums)
+            if route == ("POST", 3, ["items"], []):
+                return await self.write(self.add, *nums, args)
+            if route == ("PATCH", 4, ["items"], []):
+                return await self.write(self.change, *nums, args)
+            if route == ("DELETE", 4, ["items"], []):
+                return await self.write(self.rm, *nums)
+            if route == ("POST", 5, ["items"], ["move"]):
+                return await self.write(self.mv, *nums, args)
+        raise HTTPError(404, f"no route {method} {url.path}")
+
+    async def read(self, func, *args):
+        """Execute a lookup in the thread pool, concurrent to other lookups"""
+        await self.lock.acquire_read()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.pool, func, *args)
+        finally:
+            await self.lock.release_read()
+
+    async def write(self, func, *args):
+        """Queue a modification, return its result once it is on disk"""
+        future = asyncio.get_running_loop().create_future()
+        self.queue.put_nowait((func, args, future))
+        status, result = await future
+        if status != 200:
+            raise HTTPError(status, result)
+        return result
+
+    async def __write_batches(self):
+        """Apply all queued modifications at once, excluding lookups while
+        modifying and syncing once per batch afterwards"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            while not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+            await self.lock.acquire_write()
+            try:
+                results = await loop.run_in_executor(self.pool, self.apply, batch)
+            finally:
+                await self.lock.release_write()
+            try:
+                await loop.run_in_executor(self.pool, self.organizer.sync)
+            except Exception as e:
+                # the modifications are not on disk, fail all of the batch
+                # but keep serving the following ones
+                results = [(500, repr(e))] * len(batch)
+            for (func, args, future), result in zip(batch, results):
+                if not future.cancelled():
+                    future.set_result(result)
+
+    @staticmethod
+    def apply(batch):
+        """Execute modifications, return status and result of each"""
+        results = []
+        for func, args, future in batch:
+            try:
+                results.append((200, func(*args)))
+            except HTTPError as e:
+                results.append((e.status, e.message))
+            except Exception as e:
+                results.append((500, repr(e)))
+        return results
+
+    @staticmethod
+    def number(str):
+        """Return a path segment as number"""
+        try:
+            return int(str)
+        except ValueError:
+            raise HTTPError(404, f"invalid number {str}")
+
+    @staticmethod
+    def items(drawer, found=None):
+        """Return the items of a drawer (only the found ones if given) as list
+        of dicts including their index"""
+        found = None if found is None else {id(item) for item in found}
+        return [
+            {"item": i, "name": item.name, "amount": item.amount}
+            for i, item in enumerate(drawer.subelems)
+            if found is None or id(item) in found
+        ]
+
+    def get_drawer(self, num):
+        """Return the drawer with the given number"""
+        if not 0 <= num < len(self.organizer.drawers):
+            raise HTTPError(404, f"no drawer {num}")
+        return self.organizer.drawers[num]
+
+    def get_item(self, drawer, num):
+        """Return the item with the given index within a drawer"""
+        if not 0 <= num < len(drawer.subelems):
+            raise HTTPError(404, f"no item {num} in drawer {drawer.num}")
+        return drawer.subelems[num]
+
+    @staticmethod
+    def get_args(args, name=True, amount=True):
+        """Return name and amount given in the request body, validated"""
+        if name and not isinstance(args.get("name"), str):
+            raise HTTPError(400, "name has to be a string")
+        if name and args["name"].strip() == "":
+            raise HTTPError(400, "name must not be empty")
+        if amount and not model.Item.is_amount(args.get("amount")):
+            raise HTTPError(400, "amount has to be a number")
+        return args.get("name"), args.get("amount")
+
+    def info(self):
+        organizer = self.organizer
+        return {
+            "width": organizer.w,
+            "height": organizer.h,
+            "drawers": len(organizer.drawers),
+        }
+
+    def find(self, terms):
+        """Find items without taking the model lock, modifications are already
+        excluded by the readers-writer lock, so lookups never wait for each
+        other"""
+        organizer = self.organizer
+        found = organizer.index.find(terms)
+        if found is None:
+            found = []
+            for drawer in organizer.drawers:
+                found += [(drawer.num, items) for drawer, items in drawer.find(terms)]
+        result = [
+            {"drawer": num, "items": self.items(organizer.drawers[num], items)}
+            for num, items in found
+        ]
+        # similar items follow the exact matches, best matches first
+        if organizer.fuzzy is not None:
+            for num, item in organizer.fuzzy.find(terms):
+                items = self.items(organizer.drawers[num], [item])
+                result.append({"drawer": num, "items": items, "similar": True})
+        return result
+
+    def ls(self, num):
+        drawer = self.get_drawer(num)
+        return {"drawer": drawer.num, "items": self.items(drawer)}
+
+    def add(self, num, args):
+        drawer = self.get_drawer(num)
+        name, amount = self.get_args(args)
+        drawer.add_item(name.strip(), amount)
+        return {"drawer": drawer.num, "item": len(drawer.subelems) - 1}
+
+    def change(self, num, item_num, args):
+        drawer = self.get_drawer(num)
+        item = self.get_item(drawer, item_num)
+        if "name" not in args and "amount" not in args:
+            raise HTTPError(400, "neither name nor amount given")
+        name, amount = self.get_args(args, "name" in args, "amount" in args)
+        if "name" in args:
+            drawer.rename_item(item_num, name.strip())
+        if "amount" in args:
+            drawer.set_amount(item_num, amount)
+        return {"drawer": drawer.num, "item": item_num, **item.asdict()}
+
+    def rm(self, num, item_num):
+        drawer = self.get_drawer(num)
+        item = self.get_item(drawer, item_num)
+        drawer.remove_item(item_num)
+        return {"drawer": drawer.num, **item.asdict()}
+
+    def mv(self, num, item_num, args):
+        drawer = self.get_drawer(num)
+        item = self.get_item(drawer, item_num)
+        if not isinstance(args.get("drawer"), int):
+            raise HTTPError(400, "drawer has to be a number")
+        target = self.get_drawer(args["drawer"])
+        target.add_item(item.name, item.amount)
+        drawer.remove_item(item_num)
+        return {"drawer": target.num, "item": len(target.subelems) - 1}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--host", default=conf.SERVER_HOST)
+    parser.add_argument("--port", type=int, default=conf.SERVER_PORT)
+    parser.add_argument(
+        "--directory", help="directory containing the organizer files, e.g. a cabinet"
+    )
+    args = parser.parse_args()
+
+    files = None if args.directory is None else model.Files(args.directory)
+    organizer = model.Organizer.load(files)
+    # lookups must not load items, they are executed without the model lock
+    organizer.load_all()
+    organizer.start_autosave()
+    server = Server(organizer)
+    # save on termination as well
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        organizer.save()
@@ -6,6 +6,15 @@ f_dir = os.path.dirname(__file__)
 # char produced by enter/return at on_text event, possibly OS spcific
 CHAR_ENTER = "\r"
 FIND_MIN_LENGTH = 3
+# time in seconds to wait for further input before starting a search
+SEARCH_DEBOUNCE = 0.1
+# also list items with words similar to the search terms, e.g. with typos
+FUZZY_SEARCH = False
+# search index, either "trigram", "columns" for vectorized search of huge
+# inventories (requires numpy) or "none" to check all items on every search
+SEARCH_INDEX = "trigram"
+# amount of drawers to skip when navigating with page up/down
+JUMP_DRAWERS = 10
 
 
 # *** GUI settings ***
@@ -31,6 +40,21 @@ HANDLE_WIDTH = 0.3
 HANDLE_HEIGHT = 0.05
 HANDLE_THICKNESS = 0.03
 
+# draw all drawers using a single vertex list, speeds up resizing large
+# organizers (requires numpy)
+DRAWER_MESH = False
+
+# only redraw the window if its content changed (input, search results,
+# resizing, caret blinking) instead of at a fixed frame rate
+REDRAW_ON_DEMAND = True
+# amount of drawers whose graphics are created per frame at startup, the
+# window is shown before all of them are created
+STARTUP_DRAWERS = 250
+
+# keys switching to the previous and next cabinet, names of pyglet keys
+PREVIOUS_CABINET_KEY = "F2"
+NEXT_CABINET_KEY = "F3"
+
 # colors
 FONT_COLOR = (255, 255, 255, 255)
 ITEM_FONT_COLOR = (0, 0, 0, 255)
@@ -46,12 +70,52 @@ SELECT_MASK = (0, 50, 100)
 
 
 # *** data storage settings ***
+# storage backend, either "json" or "sqlite" for large inventories
+STORAGE_BACKEND = "json"
 # name of the json database file
 ORGANIZER_JSON = os.path.join(f_dir, "organizer.json")
+# parse the items of each drawer on demand or in the background after start,
+# reduces the startup time for huge json database files
+LAZY_LOAD = False
 # indentation of the json database file, set to None to disable formatting
 ORGANIZER_JSON_INDENT = 2
+# name of the sqlite database file, created from the json database file
+ORGANIZER_DB = os.path.join(f_dir, "organizer.db")
+# name of the journal file containing modifications since the last save
+ORGANIZER_JOURNAL = os.path.join(f_dir, "organizer.journal")
+# journal size in bytes at which it is compacted into the json database file
+JOURNAL_MAX_SIZE = 1 << 20
+# interval in seconds to save modifications in the background, 0 to disable
+AUTOSAVE_INTERVAL = 60
+# amount of imported items added at once, bounds the memory used to import
+IMPORT_BATCH = 10000
 # name of the file for the initial config
 ORGANIZER_CONF = os.path.join(f_dir, "organizer.conf")
+# directory containing one subdirectory with the above files per organizer
+# (cabinet), None to use the files above
+CABINETS_DIR = None
+# amount of processes searching all cabinets, None to use one per CPU
+SEARCH_PROCESSES = None
+# total size in bytes of the files of the searched cabinets from which on
+# they are searched by these processes instead of the calling one
+PARALLEL_SEARCH_SIZE = 16 << 20
+
+
+# *** server settings ***
+# address and port the server listens on
+SERVER_HOST = "127.0.0.1"
+SERVER_PORT = 8080
+# amount of threads executing lookups and modifications of the server
+SERVER_THREADS = 8
+
+
+# *** profiling settings ***
+# time hot code paths and count calls, adds a small overhead when enabled
+PROFILING = False
+# key toggling the overlay showing the timings, name of a pyglet key
+PROFILING_OVERLAY_KEY = "F12"
+# name of the file the timings are written to at exit, None to disable
+PROFILING_FILE = os.path.join(f_dir, "profile.json")
 
 
 # *** advanced settings, shouldn't be changed ***
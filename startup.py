@@ -0,0 +1,165 @@
+"""Startup of the GUI in steps executed one per frame after the window has been
+shown, optionally timing each step and all imports"""
+
+import sys
+import threading
+import time
+
+# imports faster than this are left out of the report, in seconds
+IMPORT_THRESHOLD = 0.002
+
+
+class ImportTimer:
+    """Meta path finder timing the loading of all modules imported after it
+    has been installed like python -X importtime, the time spent in nested
+    imports is included in the cumulative time only"""
+
+    def __init__(self):
+        # name, depth, self and cumulative time of the loaded modules in the
+        # order their loading finished
+        self.imports = []
+        # name, start and time spent in nested imports of modules being loaded
+        self.stack = []
+        self.thread = threading.get_ident()
+        self.finding = False
+
+    def install(self):
+        sys.meta_path.insert(0, self)
+
+    def uninstall(self):
+        sys.meta_path.remove(self)
+
+    def find_spec(self, name, path, target=None):
+        """Find the module spec using the other finders, replace its loader
+        by one timing the loading"""
+        if self.finding or threading.get_ident() != self.thread:
+            return None
+        start = time.perf_counter()
+        self.finding = True
+        try:
+            for finder in sys.meta_path:
+                if finder is not self and hasattr(finder, "find_spec"):
+                    spec = finder.find_spec(name, path, target)
+                    if spec is not None:
+                        break
+            else:
+                return None
+        finally:
+            self.finding = False
+        if hasattr(spec.loader, "exec_module"):
+            spec.loader = TimedLoader(self, spec.loader, time.perf_counter() - start)
+        return spec
+
+    def enter(self, name, start):
+        self.stack.append([name, start, 0])
+
+    def exit(self):
+        name, start, nested = self.stack.pop()
+        cumulative = time.perf_counter() - start
+        self.imports.append((name, len(self.stack), cumulative - nested, cumulative))
+        if self.stack:
+            self.stack[-1][2] += cumulative
+
+
+class TimedLoader:
+    """Loader reporting the start and end of loading a module to the import
+    timer, delegates everything else to the actual loader"""
+
+    def __init__(self, timer, loader, find_time):
+        self.timer = timer
+        self.loader = loader
+        self.find_time = find_time
+
+    def __getattr__(self, name):
+        return getattr(self.loader, name)
+
+    def create_module(self, spec):
+        self.timer.enter(spec.name, time.perf_counter() - self.find_time)
+        try:
+            return self.loader.create_module(spec)
+        except BaseException:
+            self.timer.exit()
+            raise
+
+    def exec_module(self, module):
+        try:
+            self.loader.exec_module(module)
+        finally:
+            self.timer.exit()
+
+
+class Startup:
+    """Executes the steps of a generator one per frame, each step yields the
+    name of the phase it belongs to, the durations are summed by phase"""
+
+    def __init__(self, profile=False):
+        self.start = time.perf_counter()
+        self.profile = profile
+        self.phases = {}
+        self.timer = None
+        self.window = None
+        self.steps = None
+        if profile:
+            self.timer = ImportTimer()
+            self.timer.install()
+
+    def add(self, name, duration):
+        self.phases[name] = self.phases.get(name, 0) + duration
+
+    def phase(self, name):
+        """Return a context manager timing a phase executed right away"""
+        return Phase(self, name)
+
+    def run(self, window, steps):
+        """Execute the given steps after the next frame of the window"""
+        from pyglet import clock
+
+        self.window = window
+        self.steps = steps
+        clock.schedule_once(self.__step, 0)
+
+    def __step(self, dt):
+        from pyglet import clock
+
+        start = time.perf_counter()
+        try:
+            name = next(self.steps)
+        except StopIteration:
+            if self.profile:
+                self.report()
+            return
+        self.add(name, time.perf_counter() - start)
+        # show the result of the step before executing the next one
+        self.window.invalidate()
+        clock.schedule_once(self.__step, 0)
+
+    def report(self):
+        """Print the duration of each phase and of all slow imports"""
+        self.timer.uninstall()
+        total = time.perf_counter() - self.start
+        print("startup phases [ms]:")
+        for name, duration in self.phases.items():
+            print(f"{duration * 1000:10.1f}  {name}")
+        print(f"{total * 1000:10.1f}  total (including frames in between)")
+        print(f"imports slower than {IMPORT_THRESHOLD * 1000:g} ms [ms]:")
+        print(f"{'self':>10}{'cumulative':>12}  module")
+        for name, depth, self_time, cumulative in self.timer.imports:
+            if cumulative >= IMPORT_THRESHOLD:
+                times = f"{self_time * 1000:10.1f}{cumulative * 1000:12.1f}"
+                print(f"{times}  {'  ' * depth}{name}")
+        sys.stdout.flush()
+
+
+class Phase:
+    """Context manager adding its duration to a phase of the startup"""
+
+    def __init__(self, startup, name):
+        self.startup = startup
+        self.name = name
+        self.start = 0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        self.startup.add(self.name, time.perf_counter() - self.start)
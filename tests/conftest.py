@@ -0,0 +1,27 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import model  # noqa: E402
+import settings as conf  # noqa: E402
+
+# layout of the organizer used by the tests: a 2x2 box with 4 drawers, a 1x2
+# box with 2 drawers and a 1x1 box with 3 drawers
+CONFIG = "a:4\nb:2\nc:3\na a b\na a b\nc\n"
+
+
+@pytest.fixture
+def files(tmp_path, monkeypatch):
+    """Use organizer files within a temporary directory, containing only the
+    config file"""
+    for name in ("ORGANIZER_CONF", "ORGANIZER_JSON", "ORGANIZER_JOURNAL"):
+        path = os.path.join(tmp_path, os.path.basename(getattr(conf, name)))
+        monkeypatch.setattr(conf, name, path)
+    monkeypatch.setattr(conf, "ORGANIZER_DB", os.path.join(tmp_path, "organizer.db"))
+    monkeypatch.setattr(conf, "AUTOSAVE_INTERVAL", 0)
+    with open(conf.ORGANIZER_CONF, "w") as f:
+        f.write(CONFIG)
+    return model.Files()
@@ -0,0 +1,80 @@
+import pytest
+
+import bulk
+import model
+
+
+@pytest.fixture
+def organizer(files):
+    organizer = model.Organizer.load(files)
+    yield organizer
+    organizer.journal.close()
+
+
+def write(tmp_path, name, text):
+    path = tmp_path / name
+    path.write_text(text)
+    return str(path)
+
+
+def test_import(tmp_path, organizer):
+    path = write(
+        tmp_path,
+        "parts.jsonl",
+        '{"x": 0, "y": 0, "drawer": 1, "name": "LED", "amount": 2.5}\n'
+        '{"x": 0, "y": 0, "drawer": 1, "name": "Resistor"}\n',
+    )
+    added = bulk.import_items(organizer, path)
+    drawer = organizer.get_box(0, 0).subelems[1]
+    assert added == {drawer: drawer.subelems}
+    assert [item.asdict() for item in drawer.subelems] == [
+        {"name": "LED", "amount": 2.5},
+        {"name": "Resistor", "amount": None},
+    ]
+
+
+@pytest.mark.parametrize("amount", ["true", '"12"', "[10, 20]", '{"n": 1}'])
+def test_import_rejects_amount(tmp_path, organizer, amount):
+    path = write(
+        tmp_path,
+        "parts.jsonl",
+        '{"x": 0, "y": 0, "drawer": 0, "name": "LED"}\n'
+        f'{{"x": 0, "y": 0, "drawer": 0, "name": "Resistor", "amount": {amount}}}\n',
+    )
+    with pytest.raises(bulk.RowError, match="line 2: amount has to be a number"):
+        bulk.import_items(organizer, path)
+    # nothing is added if any row is invalid
+    assert all(drawer.subelems == [] for drawer in organizer.drawers)
+
+
+def test_import_is_journaled(tmp_path, files, organizer, monkeypatch):
+    path = write(
+        tmp_path,
+        "parts.csv",
+        "x,y,drawer,name,amount\n0,0,1,LED,5\n0,0,1,Resistor,\n",
+    )
+    # the process ends before the import is saved
+    monkeypatch.setattr(model.Organizer, "save", lambda self: None)
+    bulk.import_items(organizer, path)
+    drawer = organizer.get_box(0, 0).subelems[1]
+    # modified meanwhile, referring to the imported items by their index
+    drawer.remove_item(0)
+    drawer.set_amount(0, 3)
+    organizer.sync()
+    organizer.journal.close()
+    monkeypatch.undo()
+    organizer, seq = model.Organizer.read(files)
+    items = organizer.get_box(0, 0).subelems[1].subelems
+    assert [item.asdict() for item in items] == [{"name": "Resistor", "amount": 3}]
+
+
+@pytest.mark.parametrize("amount", ["abc", "10k", "1,5"])
+def test_import_rejects_csv_amount(tmp_path, organizer, amount):
+    path = write(
+        tmp_path,
+        "parts.csv",
+        f'x,y,drawer,name,amount\n0,0,0,LED,\n0,0,0,Resistor,"{amount}"\n',
+    )
+    with pytest.raises(bulk.RowError, match="line 3: amount has to be a number"):
+        bulk.import_items(organizer, path)
+    assert all(drawer.subelems == [] for drawer in organizer.drawers)
@@ -0,0 +1,125 @@
+import os
+
+import pytest
+
+import model
+import settings as conf
+from cabinets import Cabinets, Search
+from conftest import CONFIG
+
+NAMES = ["tools", "parts"]
+
+
+@pytest.fixture
+def cabinets(tmp_path, monkeypatch):
+    """Directory of two cabinets, each with one item"""
+    monkeypatch.setattr(conf, "AUTOSAVE_INTERVAL", 0)
+    for i, name in enumerate(NAMES):
+        os.mkdir(tmp_path / name)
+        with open(tmp_path / name / "organizer.conf", "w") as f:
+            f.write(CONFIG)
+        organizer = model.Organizer.load(model.Files(tmp_path / name))
+        organizer.drawers[i].add_item(f"Screw {name}", i)
+        organizer.journal.close()
+    cabinets = Cabinets(tmp_path)
+    yield cabinets
+    if cabinets.pool is not None:
+        cabinets.pool.shutdown()
+
+
+EXPECTED = [
+    ("parts", 1, [{"item": 0, "name": "Screw parts", "amount": 1}]),
+    ("tools", 0, [{"item": 0, "name": "Screw tools", "amount": 0}]),
+]
+
+
+def test_small_cabinets_are_searched_in_process(cabinets):
+    assert cabinets.find(["screw"]) == EXPECTED
+    assert cabinets.pool is None
+    # loaded cabinets are searched including their unsaved modifications
+    cabinets.get("tools").drawers[2].add_item("Screw M3")
+    found = [("tools", 2, [{"item": 0, "name": "Screw M3", "amount": None}])]
+    assert cabinets.find(["m3"]) == found
+
+
+def test_search_processes_use_current_settings(cabinets, monkeypatch):
+    monkeypatch.setattr(conf, "PARALLEL_SEARCH_SIZE", 0)
+    assert cabinets.find(["screw"]) == EXPECTED
+    assert cabinets.pool is not None
+    # the items of the database are only found with the changed backend
+    monkeypatch.setattr(conf, "STORAGE_BACKEND", "sqlite")
+    cabinets.pool.shutdown()
+    cabinets.pool = None
+    for name in NAMES:
+        organizer = model.Organizer.load(model.Files(cabinets.directory / name))
+        organizer.drawers[3].add_item("Nut M3")
+        organizer.database.connection.close()
+    items = [{"item": 0, "name": "Nut M3", "amount": None}]
+    found = [(name, 3, items) for name in NAMES]
+    assert cabinets.find(["nut"]) == sorted(found)
+
+
+def test_search_lists_other_cabinets(cabinets):
+    organizer = cabinets.get("tools")
+    found = Search(model.Search(organizer), cabinets, "tools").find(["screw"])
+    assert [(drawer.num, [i.name for i in items]) for drawer, items in found] == [
+        (0, ["Screw tools"]),
+        (1, ["parts: Screw parts"]),
+    ]
+    assert found[0][0] is organizer.drawers[0]
+    assert found[1][0].cabinet == "parts"
+
+
+def test_window_shows_drawer_of_other_cabinet(cabinets):
+    pyglet = pytest.importorskip("pyglet")
+    pyglet.options["headless"] = True
+    from pyglet.graphics import Batch
+
+    import gui
+
+    window = gui.OrganizerWindow(Batch(), gui.Groups())
+    try:
+        window.create_widgets()
+        window.set_cabinets(cabinets)
+        window.draw(0)
+        # search results of the typed text, as passed by the search executor
+        window.text_input.set_text("screw")
+        window.text = "screw"
+        window.on_found(window.search.search.find(["screw"]))
+        # the first cabinet is shown, the item of the other one is listed only
+        assert [item.name for item in window.item_list.items] == [
+            "Screw parts",
+            "tools: Screw tools",
+        ]
+        assert window.organizer.masks[1] == conf.HIGHLIGHT_MASK
+        assert window.organizer.masks[0] == (0, 0, 0)
+        window.item_list.select(1)
+        window.on_enter()
+        assert cabinets.names[window.cabinet] == "tools"
+        assert window.active_drawer is window.organizer.drawers[0]
+        assert window.drawer_selected
+        assert [item.name for item in window.item_list.items] == ["Screw tools"]
+    finally:
+        window.close()
+
+
+def test_window_registers_caret_once(cabinets):
+    pyglet = pytest.importorskip("pyglet")
+    pyglet.options["headless"] = True
+    from pyglet.graphics import Batch
+
+    import gui
+
+    window = gui.OrganizerWindow(Batch(), gui.Groups())
+    try:
+        window.create_widgets()
+        handlers = len(window._event_stack)
+        window.set_cabinets(cabinets)
+        assert len(window._event_stack) == handlers + 1
+        # switching back and forth keeps the single caret handlers
+        for num in (1, 0, 1, 1):
+            window.show_cabinet(num)
+        assert len(window._event_stack) == handlers + 1
+        assert window._event_stack[0]["on_text"]() == window.text_input.caret.on_text
+    finally:
+        window.close()
@@ -0,0 +1,96 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+
+import pytest
+
+import model
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+# run the command line interface with changed settings
+RUNNER = """
+import json, runpy, sys
+import settings
+vars(settings).update(json.loads(sys.argv[1]))
+sys.argv = ["cli.py", *sys.argv[2:]]
+runpy.run_path("cli.py", run_name="__main__")
+"""
+
+
+def run(settings, *args, input=None):
+    """Run a command, return its decoded results, one per output line"""
+    process = subprocess.run(
+        [sys.executable, "-c", RUNNER, json.dumps(settings), *args],
+        cwd=ROOT,
+        input=input,
+        capture_output=True,
+        text=True,
+        timeout=20,
+    )
+    assert process.stderr == ""
+    return [json.loads(line) for line in process.stdout.splitlines()]
+
+
+def paths(directory):
+    files = model.Files(directory)
+    return {
+        "ORGANIZER_CONF": files.conf,
+        "ORGANIZER_JSON": files.json,
+        "ORGANIZER_JOURNAL": files.journal,
+        "ORGANIZER_DB": files.db,
+        "AUTOSAVE_INTERVAL": 0,
+    }
+
+
+@pytest.fixture
+def organizer(files):
+    """Saved organizer with an item whose amount is no number"""
+    organizer = model.Organizer.load(files)
+    organizer.drawers[0].add_item("Resistor 10k", 100)
+    organizer.drawers[0].add_item("Resistor kit", [10, 20])
+    organizer.drawers[2].add_item("LED red")
+    organizer.save()
+    organizer.journal.close()
+    return organizer
+
+
+def test_lookups_create_no_journal(files, organizer):
+    settings = paths(os.path.dirname(files.conf))
+    assert run(settings, "ls", "0") == [
+        {
+            "drawer": 0,
+            "items": [
+                {"item": 0, "name": "Resistor 10k", "amount": 100},
+                {"item": 1, "name": "Resistor kit", "amount": [10, 20]},
+            ],
+        }
+    ]
+    kit = {"item": 1, "name": "Resistor kit", "amount": [10, 20]}
+    assert run(settings, "find", "kit") == [[{"drawer": 0, "items": [kit]}]]
+    assert not os.path.exists(files.journal)
+
+
+def test_batch(files, organizer):
+    settings = paths(os.path.dirname(files.conf))
+    commands = "add 1 'M3 screw' 50\nrm 0 0\nmv 2 0 1\nrm 5 0\n"
+    assert run(settings, "batch", input=commands) == [
+        {"drawer": 1, "item": 0},
+        {"drawer": 0, "name": "Resistor 10k", "amount": 100},
+        {"drawer": 1, "item": 1},
+        {"error": "no item 0 in drawer 5"},
+    ]
+    organizer, seq = model.Organizer.read(files)
+    names = [[item.name for item in drawer.subelems] for drawer in organizer.drawers]
+    assert names[:3] == [["Resistor kit"], ["M3 screw", "LED red"], []]
+
+
+def test_cabinet_find_matches_find(tmp_path, tmp_path_factory, files, organizer):
+    single = run(paths(os.path.dirname(files.conf)), "find", "resistor")
+    # the same organizer as the only cabinet
+    directory = tmp_path_factory.mktemp("cabinets")
+    shutil.copytree(tmp_path, directory / "parts")
+    settings = {"CABINETS_DIR": str(directory), "AUTOSAVE_INTERVAL": 0}
+    found = run(settings, "find", "resistor")
+    assert found == [[{"cabinet": "parts", **result} for result in single[0]]]
@@ -0,0 +1,265 @@
+import sys
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+pyglet = pytest.importorskip("pyglet")
+pyglet.options["headless"] = True
+
+from pyglet import app  # noqa: E402
+
+import gui  # noqa: E402
+import model  # noqa: E402
+import settings as conf  # noqa: E402
+
+
+class BlockingSearch:
+    """Search returning the terms it was called with, blocks on the first
+    query until released"""
+
+    def __init__(self):
+        self.queries = []
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def find(self, str):
+        self.queries.append(str)
+        if len(self.queries) == 1:
+            self.started.set()
+            self.release.wait(5)
+        return str
+
+
+def test_search_executor_applies_newest_query(monkeypatch):
+    monkeypatch.setattr(conf, "SEARCH_DEBOUNCE", 0)
+    search = BlockingSearch()
+    found = []
+    executor = gui.SearchExecutor(search, found.append, pytest.fail)
+    executor.submit(["a"])
+    assert search.started.wait(5)
+    # typing on while the first search runs, its results are outdated
+    for query in (["ab"], ["abc"]):
+        executor.submit(query)
+    search.release.set()
+    end = time.monotonic() + 5
+    while len(search.queries) < 2 or found == []:
+        assert time.monotonic() < end
+        app.platform_event_loop.dispatch_posted_events()
+        time.sleep(0.01)
+    app.platform_event_loop.dispatch_posted_events()
+    assert search.queries == [["a"], ["abc"]]
+    assert found == [["abc"]]
+
+
+class FailingSearch:
+    """Search failing for the term "fail", finding nothing otherwise"""
+
+    def find(self, str):
+        if str == ["fail"]:
+            raise ValueError("broken cabinet")
+        return []
+
+
+def test_search_executor_survives_failing_search(monkeypatch):
+    monkeypatch.setattr(conf, "SEARCH_DEBOUNCE", 0)
+    found = []
+    errors = []
+    executor = gui.SearchExecutor(FailingSearch(), found.append, errors.append)
+    for query in (["fail"], ["led"]):
+        executor.submit(query)
+        end = time.monotonic() + 5
+        while len(found) + len(errors) == 0:
+            assert time.monotonic() < end
+            app.platform_event_loop.dispatch_posted_events()
+            time.sleep(0.01)
+        if query == ["fail"]:
+            assert found == [] and str(errors.pop()) == "broken cabinet"
+    assert found == [[]] and errors == []
+
+
+def create_item_list(rows):
+    from pyglet.graphics import Batch
+
+    from widgets import ItemList
+
+    item_list = ItemList(20, Batch(), gui.Groups())
+    item_list.resize(0, 500, 300, rows * item_list.line_height)
+    return item_list
+
+
+def test_item_list_shortens_long_names():
+    item_list = create_item_list(3)
+    item_list.set_items([model.Item("Resistor " * 50), model.Item("LED")])
+    label = item_list.labels[0]
+    assert label.content_width <= item_list.text_w
+    assert label.text.startswith("Resistor") and label.text.endswith("…")
+    assert item_list.labels[1].text == "LED"
+
+
+def test_item_list_keeps_selection_visible():
+    item_list = create_item_list(3)
+    items = [model.Item(f"Item {i}") for i in range(50)]
+    item_list.set_items(items)
+    item_list.select(40)
+    assert item_list.top == 38
+    # e.g. renaming the selected item
+    item_list.set_items(list(items))
+    assert item_list.get_selected() == 40
+    assert item_list.top <= 40 < item_list.top + 3
+    assert item_list.select_rect.visible
+    # e.g. removing items, the selection is limited to the last item
+    item_list.set_items(items[:10])
+    assert item_list.get_selected() == 9
+    assert item_list.top <= 9 < item_list.top + 3
+
+
+@pytest.mark.parametrize("available", [True, False])
+def test_drawer_mesh_falls_back_without_numpy(files, monkeypatch, available):
+    from pyglet.graphics import Batch
+
+    monkeypatch.setattr(conf, "DRAWER_MESH", True)
+    if available:
+        pytest.importorskip("numpy")
+    else:
+        # importing a module set to None raises an ImportError
+        monkeypatch.setitem(sys.modules, "mesh", None)
+    organizer = gui.OrganizerGUI(model.Organizer.load(files), Batch(), gui.Groups())
+    assert (organizer.mesh is not None) == available
+    assert organizer.created == len(organizer.drawers)
+    # text input and item list are not needed to place the drawers
+    widget = SimpleNamespace(rect=SimpleNamespace(height=30), resize=lambda *args: None)
+    organizer.resize(800, 600, widget, widget)
+    assert all(drawer.rect.width > 0 for drawer in organizer.drawers)
+
+
+@pytest.fixture
+def window(files):
+    """Window showing an organizer, its events are only dispatched by
+    dispatch_events like in the event loop"""
+    from pyglet.graphics import Batch
+
+    groups = gui.Groups()
+    window = gui.OrganizerWindow(Batch(), groups)
+    window.create_widgets()
+    organizer = model.Organizer.load(files)
+    window.set_organizer(gui.OrganizerGUI(organizer, window.batch, groups))
+    yield window
+    window.close()
+    organizer.journal.close()
+
+
+def wait(window, condition):
+    """Dispatch the posted and the window events until condition is met"""
+    end = time.monotonic() + 5
+    while not condition():
+        assert time.monotonic() < end
+        app.platform_event_loop.dispatch_posted_events()
+        window.dispatch_events()
+        time.sleep(0.01)
+
+
+def test_file_drop_imports_in_background(window, tmp_path):
+    valid = tmp_path / "parts.csv"
+    valid.write_text("x,y,drawer,name,amount\n0,0,1,LED,5\n")
+    invalid = tmp_path / "invalid.jsonl"
+    invalid.write_text('{"x": 0, "y": 0, "drawer": 1, "name": "LED", "amount": true}\n')
+    paths = [str(valid), str(invalid), str(tmp_path / "missing.csv")]
+    # events of the window are queued until it dispatches them
+    window.dispatch_event("on_file_drop", 0, 0, paths)
+    wait(window, lambda: window.message.visible)
+    assert [item.name for item in window.item_list.items] == ["LED"]
+    assert window.message.visible
+    lines = window.message.text.split("\n")
+    assert len(lines) == 2
+    assert lines[0].startswith("importing invalid.jsonl failed: line 1")
+    assert lines[1].startswith("importing missing.csv failed")
+    # the message is removed with all other highlighting
+    window.dispatch_event("on_key_press", gui.key.ESCAPE, 0)
+    window.dispatch_events()
+    assert not window.message.visible
+
+
+def test_failing_search_is_shown(window, monkeypatch):
+    monkeypatch.setattr(conf, "SEARCH_DEBOUNCE", 0)
+    window.search.set_search(FailingSearch())
+    window.on_search("fail")
+    wait(window, lambda: window.message.visible)
+    assert window.message.text == "searching failed: broken cabinet"
+    # searching goes on
+    window.on_search("led")
+    wait(window, lambda: not window.message.visible)
+
+
+def color(organizer, num):
+    """Return the color of a drawer, stored in the mesh if used"""
+    if organizer.mesh is None:
+        return list(organizer.drawers[num].rect.color[:3])
+    import mesh
+
+    colors = organizer.mesh.vertex_list.colors
+    return list(colors[num * mesh.DRAWER_VERTICES * 3 :][:3])
+
+
+@pytest.mark.parametrize("mesh", [False, True])
+def test_only_changed_drawers_are_recoloured(files, monkeypatch, mesh):
+    from pyglet.graphics import Batch
+
+    if mesh:
+        pytest.importorskip("numpy")
+    monkeypatch.setattr(conf, "DRAWER_MESH", mesh)
+    organizer = gui.OrganizerGUI(model.Organizer.load(files), Batch(), gui.Groups())
+    recoloured = []
+    if mesh:
+        set_colors = organizer.mesh.set_colors
+
+        def record(masks):
+            recoloured.extend(masks)
+            set_colors(masks)
+
+        monkeypatch.setattr(organizer.mesh, "set_colors", record)
+    else:
+        set_color = gui.DrawerGUI.set_color
+
+        def record(drawer, mask):
+            recoloured.append(drawer.num)
+            set_color(drawer, mask)
+
+        monkeypatch.setattr(gui.DrawerGUI, "set_color", record)
+    drawers = organizer.drawers
+    masks = {drawers[0]: conf.HIGHLIGHT_MASK, drawers[1]: conf.HIGHLIGHT_MASK}
+    organizer.highlight(masks)
+    assert sorted(recoloured) == [0, 1]
+    recoloured.clear()
+    # drawer 1 stays highlighted and drawer 3 keeps its mask
+    masks = {drawers[0]: (0, 0, 0), drawers[1]: conf.HIGHLIGHT_MASK}
+    masks[drawers[2]] = conf.SELECT_MASK
+    masks[drawers[3]] = (0, 0, 0)
+    organizer.highlight(masks)
+    assert sorted(recoloured) == [0, 2]
+    recoloured.clear()
+    organizer.highlight(masks)
+    assert recoloured == []
+    # the colors are those of the masks
+    expected = [conf.DRAWER_COLOR[i] + conf.SELECT_MASK[i] for i in range(3)]
+    assert color(organizer, 2) == expected
+    assert color(organizer, 0) == list(conf.DRAWER_COLOR)
+
+
+def test_redraws_are_coalesced(window, monkeypatch):
+    from pyglet import clock
+
+    monkeypatch.setattr(conf, "REDRAW_ON_DEMAND", True)
+    draws = []
+    monkeypatch.setattr(window, "draw", draws.append)
+    # redraws pending since creating the window
+    clock.tick()
+    draws.clear()
+    for _ in range(3):
+        window.invalidate()
+    clock.tick()
+    assert len(draws) == 1
+    # nothing changed, nothing is drawn
+    clock.tick()
+    assert len(draws) == 1
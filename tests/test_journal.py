@@ -0,0 +1,99 @@
+import json
+import os
+import threading
+
+import model
+import settings as conf
+
+
+def names(organizer, num=0):
+    return [item.name for item in organizer.drawers[num].get_items()]
+
+
+def test_replay_after_crash(files):
+    organizer = model.Organizer.load(files)
+    organizer.drawers[0].add_item("Resistor 10k", 100)
+    organizer.drawers[0].add_item("LED red")
+    organizer.drawers[0].rename_item(1, "LED green")
+    organizer.drawers[0].set_amount(0, 50)
+    organizer.drawers[0].remove_item(1)
+    organizer.drawers[1].add_item("M3 screw")
+    # crash while appending a record, without saving the organizer
+    with open(files.journal, "a") as f:
+        f.write('[7,"add",0,"trunc')
+    organizer, seq = model.Organizer.read(files)
+    assert seq == 6
+    assert names(organizer) == ["Resistor 10k"]
+    assert organizer.drawers[0].subelems[0].amount == 50
+    assert names(organizer, 1) == ["M3 screw"]
+    # the truncated record is dropped before appending further records
+    organizer = model.Organizer.load(files)
+    organizer.drawers[0].add_item("LED blue")
+    assert names(model.Organizer.read(files)[0]) == ["Resistor 10k", "LED blue"]
+
+
+def test_saved_records_are_skipped(files):
+    organizer = model.Organizer.load(files)
+    organizer.drawers[0].add_item("Resistor 10k")
+    organizer.drawers[0].add_item("LED red")
+    with open(files.journal) as f:
+        records = f.read()
+    organizer.save()
+    with open(files.json) as f:
+        assert json.load(f)["seq"] == 2
+    # crash after saving but before the rotated journal was removed
+    with open(files.journal + ".old", "w") as f:
+        f.write(records)
+    organizer.drawers[0].add_item("M3 screw")
+    organizer, seq = model.Organizer.read(files)
+    assert seq == 3
+    assert names(organizer) == ["Resistor 10k", "LED red", "M3 screw"]
+
+
+def test_compaction(files, monkeypatch):
+    monkeypatch.setattr(conf, "JOURNAL_MAX_SIZE", 1000)
+    organizer = model.Organizer.load(files)
+    for i in range(100):
+        organizer.drawers[i % 3].add_item(f"Item {i}")
+    # the journal is compacted into the json database file in the background
+    for thread in threading.enumerate():
+        if thread is not threading.current_thread() and not thread.daemon:
+            thread.join(5)
+    assert os.path.getsize(files.journal) < conf.JOURNAL_MAX_SIZE
+    assert not os.path.exists(files.journal + ".old")
+    with open(files.json) as f:
+        assert 0 < json.load(f)["seq"] < 100
+    organizer, seq = model.Organizer.read(files)
+    assert seq == 100
+    items = [item.name for drawer in organizer.drawers for item in drawer.subelems]
+    assert sorted(items) == sorted(f"Item {i}" for i in range(100))
+
+
+def test_saving_unchanged_organizer_costs_no_io(files, monkeypatch):
+    organizer = model.Organizer.load(files)
+    organizer.drawers[0].add_item("Resistor 10k")
+    organizer.save()
+    # the file is replaced when saving, so its inode changes as well
+    stat = os.stat(files.json)
+    state = (stat.st_ino, stat.st_mtime_ns)
+    listing = sorted(os.listdir(os.path.dirname(files.json)))
+
+    def fail(*args, **kwargs):
+        raise AssertionError("unchanged organizer accessed the disk")
+
+    with monkeypatch.context() as m:
+        for name in ("builtins.open", "os.replace", "os.remove", "os.fsync"):
+            m.setattr(name, fail)
+        assert not organizer.is_dirty()
+        organizer.save()
+    stat = os.stat(files.json)
+    assert (stat.st_ino, stat.st_mtime_ns) == state
+    assert sorted(os.listdir(os.path.dirname(files.json))) == listing
+    # a modification is saved
+    organizer.drawers[0].rename_item(0, "Resistor 4.7k")
+    assert organizer.is_dirty()
+    organizer.save()
+    stat = os.stat(files.json)
+    assert (stat.st_ino, stat.st_mtime_ns) != state
+    assert not organizer.is_dirty()
+    assert names(model.Organizer.read(files)[0]) == ["Resistor 4.7k"]
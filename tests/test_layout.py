@@ -0,0 +1,138 @@
+import copy
+import random
+
+import pytest
+
+import model
+
+CONFIG = "a:1\nb:2\nc:3\nd:4\ne:5\n"
+
+
+def parse_reference(layout):
+    """Layout parser preceding the union-find one, scans for the top left block
+    of each box and extends it to the right and downwards, only correct for
+    layouts of rectangular boxes, return symbol, left column, top row, width
+    and height of each box"""
+    layout = copy.deepcopy(layout)
+    org_w = len(layout[0])
+    org_h = len(layout)
+    boxes = []
+    for i, line in enumerate(layout):
+        j = 0
+        while j < org_w:
+            s = c = line[j]
+            if c == "":
+                j += 1
+                continue
+            w = h = 0
+            x = j
+            while c == s and j < org_w:
+                j += 1
+                w += 1
+                if j < org_w:
+                    c = line[j]
+            c = s
+            while c == s and i + h < org_h:
+                for k in range(w):
+                    layout[i + h][x + k] = ""
+                h += 1
+                if i + h < org_h:
+                    c = layout[i + h][x]
+            boxes.append((s, x, i, w, h))
+    return boxes
+
+
+def render(boxes, layout):
+    """Return a layout of the same size as the given one filled with boxes"""
+    result = [[""] * len(line) for line in layout]
+    for s, x, i, w, h in boxes:
+        for row in result[i : i + h]:
+            row[x : x + w] = [s] * w
+    return result
+
+
+def parse(layout):
+    return [(s, x, i, w, h) for s, x, i, w, h, blocks in model.Layout(layout).boxes()]
+
+
+def random_tiling(rng, w, h):
+    """Return a layout of w x h blocks split into random rectangular boxes,
+    adjacent boxes have different symbols, some boxes are left empty"""
+    rects = []
+
+    def split(x, y, w, h):
+        if w * h > 1 and rng.random() < 0.8:
+            if w > 1 and (h == 1 or rng.random() < 0.5):
+                cut = rng.randrange(1, w)
+                split(x, y, cut, h)
+                split(x + cut, y, w - cut, h)
+            else:
+                cut = rng.randrange(1, h)
+                split(x, y, w, cut)
+                split(x, y + cut, w, h - cut)
+        else:
+            rects.append((x, y, w, h))
+
+    split(0, 0, w, h)
+    layout = [[None] * w for _ in range(h)]
+    for x, y, rw, rh in rects:
+        # symbols of the blocks around the box
+        around = set()
+        for i in range(y - 1, y + rh + 1):
+            for j in range(x - 1, x + rw + 1):
+                if 0 <= i < h and 0 <= j < w:
+                    around.add(layout[i][j])
+        free = [s for s in "abcde" if s not in around]
+        s = "" if rng.random() < 0.1 or not free else rng.choice(free)
+        for i in range(y, y + rh):
+            layout[i][x : x + rw] = [s] * rw
+    return layout
+
+
+@pytest.mark.parametrize("seed", range(200))
+def test_random_tilings_match_reference(seed):
+    rng = random.Random(seed)
+    layout = random_tiling(rng, rng.randint(1, 12), rng.randint(1, 12))
+    assert parse(layout) == parse_reference(layout)
+    assert render(parse(layout), layout) == layout
+
+
+@pytest.mark.parametrize(
+    "lines",
+    [
+        # boxes of equal symbols which don't touch each other
+        ["a b a", "b a b"],
+        # pinwheel, not splittable by a straight cut
+        ["a a b", "d e b", "d c c"],
+        # box within the columns of a larger one
+        ["a a a", "b c d", "e e e"],
+    ],
+)
+def test_nested_layouts_match_reference(lines):
+    layout = [line.split(" ") for line in lines]
+    assert parse(layout) == parse_reference(layout)
+
+
+@pytest.mark.parametrize(
+    "lines, error",
+    [
+        # box enclosing another one
+        (["a a a", "a b a", "a a a"], "box a spanning lines 6-8, columns 1-3"),
+        # L-shape, the reference parser splits it into two boxes
+        (["a a", "a b"], "box a spanning lines 6-7, columns 1-2"),
+        # U-shape joined at the bottom
+        (["a b a", "a a a"], "box a spanning lines 6-7, columns 1-3"),
+        # boxes only touching at a corner are separate, but one is not a box
+        (["a b", "b b"], "box b spanning lines 6-7, columns 1-2"),
+    ],
+)
+def test_non_rectangular_boxes_are_reported(files, lines, error):
+    layout = [line.split(" ") for line in lines]
+    # the reference parser silently returned boxes covering other ones or
+    # splitting the connected blocks into several boxes
+    reference = parse_reference(layout)
+    assert render(reference, layout) != layout or len(reference) > len(parse(layout))
+    with open(files.conf, "w") as f:
+        f.write(CONFIG + "\n".join(lines) + "\n")
+    with pytest.raises(ValueError, match=f"{error} is not rectangular"):
+        model.Organizer.read(files)
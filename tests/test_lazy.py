@@ -0,0 +1,73 @@
+import os
+import time
+
+import model
+import settings as conf
+
+
+def items(organizer):
+    organizer.load_all()
+    return [[item.asdict() for item in drawer.subelems] for drawer in organizer.drawers]
+
+
+def create(files, amount):
+    """Save an organizer with some items, one of them having the given amount"""
+    organizer = model.Organizer.load(files)
+    for i in range(20):
+        organizer.drawers[i % 3].add_item(f"Item {i}", i)
+    organizer.drawers[1].add_item('Kit "large"', amount)
+    organizer.save()
+    return items(organizer)
+
+
+def test_lazy_load(files, monkeypatch):
+    expected = create(files, 5)
+    monkeypatch.setattr(conf, "LAZY_LOAD", True)
+    organizer, seq = model.Organizer.read(files)
+    assert sorted(organizer.pending) == [0, 1, 2]
+    assert items(organizer) == expected
+    # the structure is read from the cache the second time
+    organizer, seq = model.Organizer.read(files)
+    assert sorted(organizer.pending) == [0, 1, 2]
+    assert items(organizer) == expected
+
+
+def test_malformed_file_falls_back_to_full_parse(files, monkeypatch):
+    expected = create(files, [10, 20])
+    monkeypatch.setattr(conf, "LAZY_LOAD", True)
+    start = time.perf_counter()
+    organizer, seq = model.Organizer.read(files)
+    assert time.perf_counter() - start < 1
+    assert organizer.pending == {}
+    assert items(organizer) == expected
+
+
+def test_outdated_cache_is_replaced(files, monkeypatch):
+    create(files, 5)
+    monkeypatch.setattr(conf, "LAZY_LOAD", True)
+    organizer, seq = model.Organizer.read(files)
+    organizer.load_all()
+    assert os.path.exists(files.json + ".lazy")
+    # saved again with other items, the cached positions are outdated
+    organizer.drawers[0].remove_item(0)
+    organizer.drawers[2].add_item("Résistance")
+    organizer.save()
+    expected = items(organizer)
+    organizer, seq = model.Organizer.read(files)
+    assert items(organizer) == expected
+    assert organizer.source.closed
+
+
+def test_pending_items_are_loaded_on_demand(files, monkeypatch):
+    expected = create(files, 5)
+    monkeypatch.setattr(conf, "LAZY_LOAD", True)
+    organizer, seq = model.Organizer.read(files)
+    # peeking leaves the items pending
+    peeked = [[i.asdict() for i in organizer.peek_items(n)] for n in range(3)]
+    assert peeked == expected[:3]
+    assert sorted(organizer.pending) == [0, 1, 2]
+    # only drawers whose items may contain the terms are loaded
+    organizer.load_matching(["large"])
+    assert sorted(organizer.pending) == [0, 2]
+    assert [item.name for item in organizer.drawers[1].subelems][-1] == 'Kit "large"'
+    assert [d for d, found in organizer.find(["item", "19"])] == [organizer.drawers[1]]
@@ -0,0 +1,127 @@
+import os
+import random
+from types import SimpleNamespace
+
+import pytest
+
+import model
+import settings as conf
+from test_layout import random_tiling
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+# layouts of different shapes, including empty blocks and unequal drawer
+# counts of neighbouring boxes
+LAYOUTS = [
+    "a:4\nb:2\nc:3\na a b\na a b\nc\n",
+    "a:1\nb:3\nc:2\nd:5\na b c\nd   a\nd b b\n",
+    "a:2\nb:3\nc:1\na b a b a\nb a b a b\n  c c c\n",
+]
+
+
+def organizers(tmp_path, count=10):
+    """Yield organizers of the layouts above, the one of the repository and
+    count random tilings"""
+    configs = list(LAYOUTS)
+    with open(os.path.join(ROOT, "organizer.conf")) as f:
+        configs.append(f.read())
+    rng = random.Random(0)
+    for _ in range(count):
+        layout = random_tiling(rng, rng.randrange(1, 8), rng.randrange(1, 8))
+        lines = "\n".join(" ".join(line) for line in layout)
+        configs.append("a:1\nb:2\nc:3\nd:4\ne:5\n" + lines + "\n")
+    path = tmp_path / "organizer.conf"
+    for config in configs:
+        path.write_text(config)
+        yield model.Organizer._Organizer__parse_config(str(path))
+
+
+def scan_box(organizer, x, y):
+    """Box lookup preceding the block grid, scans all boxes"""
+    for box in organizer.subelems:
+        if box.x <= x <= box.x + box.w - 1 and box.y <= y <= box.y + box.h - 1:
+            return box
+    return None
+
+
+def scan_neighbour(organizer, drawer, direction):
+    """Navigation preceding the neighbour graph, looks up the adjacent box of
+    the drawer's box on each move"""
+    box = next(box for box in organizer.subelems if drawer in box.subelems)
+    drawers = box.subelems
+    i = drawers.index(drawer)
+    if direction == "down":
+        if i < len(drawers) - 1:
+            return drawers[i + 1]
+        new_box = scan_box(organizer, box.x, box.y - 1)
+        return None if new_box is None else new_box.subelems[0]
+    if direction == "up":
+        if i > 0:
+            return drawers[i - 1]
+        new_box = scan_box(organizer, box.x, box.y + box.h)
+        return None if new_box is None else new_box.subelems[-1]
+    if direction == "left":
+        new_box = scan_box(organizer, box.x - 1, box.y)
+    else:
+        new_box = scan_box(organizer, box.x + box.w, box.y)
+    if new_box is None:
+        return None
+    return new_box.subelems[i * len(new_box.subelems) // len(drawers)]
+
+
+def test_get_box_matches_scan(tmp_path):
+    for organizer in organizers(tmp_path):
+        for y in range(-1, organizer.h + 1):
+            for x in range(-1, organizer.w + 1):
+                assert organizer.get_box(x, y) is scan_box(organizer, x, y)
+
+
+def test_neighbours_match_scan(tmp_path):
+    for organizer in organizers(tmp_path):
+        for drawer in organizer.drawers:
+            for direction in ("up", "down", "left", "right"):
+                expected = scan_neighbour(organizer, drawer, direction)
+                assert organizer.get_neighbour(drawer, direction) is expected
+
+
+def points(rect, margin):
+    """Return points at the corners and edges of a rectangle, just inside and
+    outside of it as well as in the surrounding margin"""
+    xs = [rect.x, rect.x + rect.width / 2, rect.x + rect.width]
+    ys = [rect.y, rect.y + rect.height / 2, rect.y + rect.height]
+    offsets = [-margin, -1e-6, 0, 1e-6, margin]
+    xs = [x + dx for x in xs for dx in offsets]
+    ys = [y + dy for y in ys for dy in offsets]
+    return [(x, y) for x in xs for y in ys]
+
+
+@pytest.mark.parametrize(
+    "mesh, size", [(False, (800, 600)), (False, (600, 800)), (True, (800, 600))]
+)
+def test_clicked_drawer_matches_scan(tmp_path, monkeypatch, mesh, size):
+    pyglet = pytest.importorskip("pyglet")
+    pyglet.options["headless"] = True
+    from pyglet.graphics import Batch
+
+    import gui
+
+    if mesh:
+        pytest.importorskip("numpy")
+    monkeypatch.setattr(conf, "DRAWER_MESH", mesh)
+    # text input and item list are not needed to place the drawers
+    widget = SimpleNamespace(rect=SimpleNamespace(height=30), resize=lambda *args: None)
+    for organizer in organizers(tmp_path, 3):
+        organizer = gui.OrganizerGUI(organizer, Batch(), gui.Groups())
+        organizer.resize(*size, widget, widget)
+        margin = organizer.block_size * conf.DRAWER_MARGIN
+        for drawer in organizer.drawers:
+            for x, y in points(drawer.rect, margin):
+                expected = next(
+                    (d for d in organizer.drawers if d.is_clicked(x, y)), None
+                )
+                assert organizer.get_drawer(x, y) is expected
+        # outside of the organizer
+        rect = organizer.rect
+        for x, y in points(rect, organizer.block_size * conf.BOX_MARGIN):
+            drawers = organizer.drawers
+            expected = next((d for d in drawers if d.is_clicked(x, y)), None)
+            assert organizer.get_drawer(x, y) is expected
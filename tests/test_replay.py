@@ -0,0 +1,56 @@
+import json
+import os
+import sys
+from argparse import Namespace
+
+import pytest
+
+pyglet = pytest.importorskip("pyglet")
+pyglet.options["headless"] = True
+
+from pyglet.window import Window, key  # noqa: E402
+
+import settings as conf  # noqa: E402
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "bench"))
+
+import replay  # noqa: E402
+
+
+def test_record_and_replay(files, tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(conf, "SEARCH_DEBOUNCE", 0)
+    # replaying dispatches the events right away
+    monkeypatch.setattr(Window, "_enable_event_queue", True)
+    path = str(tmp_path / "session.jsonl")
+    window, organizer, organizer_gui = replay.create_window()
+    recorder = replay.start_recording(window, organizer_gui, path)
+    # typing a search, selecting the first item and its drawer
+    for text in "led":
+        window.dispatch_event("on_text", text)
+    window.dispatch_event("on_text_motion", key.MOTION_DOWN)
+    window.dispatch_event("on_key_press", key.ENTER, 0)
+    window.dispatch_events()
+    recorder.close()
+    window.close()
+    organizer.journal.close()
+    with open(path) as f:
+        events = [json.loads(line)[1:] for line in f]
+    # the size of the window is recorded first
+    assert events[0][0] == "on_resize"
+    assert events[1:] == [
+        ["on_text", "l"],
+        ["on_text", "e"],
+        ["on_text", "d"],
+        ["on_text_motion", key.MOTION_DOWN],
+        ["on_key_press", key.ENTER, 0],
+    ]
+
+    output = str(tmp_path / "latency.json")
+    args = Namespace(file=path, items=None, speed=100.0, wait=0.1, output=output)
+    replay.replay(args)
+    with open(output) as f:
+        summary = json.load(f)
+    assert summary["on_text"]["count"] == 3
+    assert summary["on_text_motion"]["count"] == 1
+    assert summary["on_search"]["count"] >= 3
+    assert summary["search"]["count"] >= 1
@@ -0,0 +1,83 @@
+import random
+
+import pytest
+
+import model
+import settings as conf
+
+WORDS = ["Resistor", "capacitor", "LED", "screw", "M3", "M2", "10k", "100nF"]
+QUERIES = [
+    ["resistor"],
+    ["res"],
+    ["10k", "resistor"],
+    ["m3"],
+    ["m3", "screw"],
+    ["led", "m"],
+    ["crew", "100nf"],
+    ["r 1"],
+    ["missing"],
+]
+
+
+def result(found):
+    """Return search results as drawer numbers and item identities"""
+    return [(drawer.num, [id(item) for item in items]) for drawer, items in found]
+
+
+@pytest.mark.parametrize(
+    "backend, index",
+    [("json", "trigram"), ("json", "columns"), ("json", "none"), ("sqlite", None)],
+)
+def test_index_matches_scan(files, monkeypatch, backend, index):
+    if index == "columns":
+        pytest.importorskip("numpy")
+    monkeypatch.setattr(conf, "STORAGE_BACKEND", backend)
+    monkeypatch.setattr(conf, "SEARCH_INDEX", index or "trigram")
+    organizer = model.Organizer.load(files)
+    rng = random.Random(0)
+    for _ in range(300):
+        drawer = rng.choice(organizer.drawers)
+        drawer.add_item(" ".join(rng.sample(WORDS, 3)), rng.randrange(10))
+    # modify some items so the indices have to be updated as well
+    for drawer in organizer.drawers[::2]:
+        drawer.rename_item(0, "r 1 " + drawer.subelems[0].name)
+        drawer.remove_item(1)
+    for query in QUERIES:
+        expected = result(model.Element.find(organizer, query))
+        assert result(organizer.find(query)) == expected, query
+
+
+@pytest.mark.parametrize("backend", ["json", "sqlite"])
+def test_fuzzy_search_after_loading(files, monkeypatch, backend):
+    monkeypatch.setattr(conf, "STORAGE_BACKEND", backend)
+    monkeypatch.setattr(conf, "FUZZY_SEARCH", True)
+    organizer = model.Organizer.load(files)
+    organizer.drawers[2].add_item("Capacitor 100nF")
+    organizer.save()
+    organizer = model.Organizer.load(files)
+    found = organizer.find_fuzzy(["capacitro"])
+    assert [(drawer.num, [item.name for item in items]) for drawer, items in found] == [
+        (2, ["Capacitor 100nF"])
+    ]
+
+
+@pytest.mark.parametrize("index", ["trigram", "columns", "none"])
+def test_search_candidates_are_noted(files, monkeypatch, index):
+    import profiling
+
+    if index == "columns":
+        pytest.importorskip("numpy")
+    monkeypatch.setattr(conf, "SEARCH_INDEX", index)
+    monkeypatch.setattr(conf, "PROFILING", True)
+    monkeypatch.setattr(profiling, "values", {})
+    organizer = model.Organizer.load(files)
+    for name in ("Resistor 10k", "Resistor 1k", "Resin", "LED"):
+        organizer.drawers[0].add_item(name)
+    if index == "columns":
+        organizer.index.merge()
+    found = organizer.find(["resist", "1k"])
+    assert [item.name for item in found[0][1]] == ["Resistor 1k"]
+    # candidates are counted before the terms are confirmed, "1k" is too short
+    # to be looked up in the trigram index
+    candidates = {"trigram": 2, "columns": 1, "none": 4}[index]
+    assert profiling.values["search candidates"] == candidates
@@ -0,0 +1,49 @@
+import asyncio
+
+import pytest
+
+import model
+from server import HTTPError, Server
+
+
+@pytest.fixture
+def server(files):
+    organizer = model.Organizer.load(files)
+    yield Server(organizer)
+    organizer.journal.close()
+
+
+@pytest.mark.parametrize("amount", [None, 0, 12, 2.5])
+def test_valid_amount(amount):
+    args = {"name": "Resistor", "amount": amount}
+    assert Server.get_args(args) == ("Resistor", amount)
+
+
+@pytest.mark.parametrize("amount", [True, False, "12", [10, 20], {"n": 1}])
+def test_invalid_amount(amount):
+    with pytest.raises(HTTPError) as e:
+        Server.get_args({"name": "Resistor", "amount": amount})
+    assert e.value.status == 400
+
+
+def test_failing_sync(server, monkeypatch):
+    def sync(self):
+        monkeypatch.undo()
+        raise OSError("disk full")
+
+    async def requests():
+        server.queue = asyncio.Queue()
+        writer = asyncio.create_task(server._Server__write_batches())
+        try:
+            monkeypatch.setattr(model.Organizer, "sync", sync)
+            with pytest.raises(HTTPError) as e:
+                await server.write(server.add, 0, {"name": "Resistor"})
+            assert e.value.status == 500
+            assert "disk full" in e.value.message
+            # the writer keeps applying modifications
+            result = await server.write(server.add, 1, {"name": "Capacitor"})
+            assert result == {"drawer": 1, "item": 0}
+        finally:
+            writer.cancel()
+
+    asyncio.run(requests())
@@ -0,0 +1,306 @@
+"""Text input and item list of the window, imported once the window is shown
+since the text stack of pyglet takes a while to load"""
+
+from pyglet import event
+from pyglet.shapes import Rectangle
+from pyglet.text import Label, caret
+from pyglet.text.document import FormattedDocument
+from pyglet.text.layout import IncrementalTextLayout
+
+import profiling
+import settings as conf
+
+
+class TextInput:
+    """Text input field"""
+
+    def __init__(
+        self,
+        batch,
+        groups,
+        on_click,
+        on_enter,
+        on_motion,
+        on_search,
+        on_scroll,
+        on_blink,
+    ):
+        # create document
+        self.document = FormattedDocument(" ")
+        self.document.set_style(
+            0,
+            1,
+            dict(
+                font_name=conf.FONT_NAME,
+                font_size=conf.FONT_SIZE,
+                color=conf.FONT_COLOR,
+            ),
+        )
+        # calculate font height and margin
+        font = self.document.get_font(0)
+        self.font_height = font.ascent - font.descent
+        self.margin = self.font_height * conf.TEXT_INPUT_MARGIN
+        # create text input
+        self.input = IncrementalTextLayout(
+            self.document, 100, self.font_height, batch=batch, group=groups[1]
+        )
+        self.input.x = 100
+        self.input.y = 100
+        # creating a caret and push it to window handlers
+        self.caret = Caret(
+            self.input,
+            conf.FONT_COLOR[:3],
+            on_click,
+            on_enter,
+            on_motion,
+            on_search,
+            on_scroll,
+            on_blink,
+        )
+        self.clear_text()
+        # create background rectangle
+        self.rect = Rectangle(
+            0,
+            0,
+            100,
+            self.font_height + 2 * self.margin,
+            color=conf.TEXT_INPUT_COLOR,
+            batch=batch,
+            group=groups[0],
+        )
+
+    def resize(self, x, y, w):
+        """Resize the text input with given coordinates and width"""
+        self.rect.x = x
+        self.rect.y = y
+        self.rect.width = w
+        self.input.x = int(x + self.margin)
+        self.input.y = int(y + self.margin)
+        self.input.width = int(w - 2 * self.margin)
+
+    def get_text(self):
+        """Return currently displayed text"""
+        return self.document.text
+
+    def set_text(self, text):
+        """Set the text to display"""
+        self.document.text = text
+
+    def clear_text(self):
+        """Clear displayed text"""
+        self.document.text = ""
+
+
+class ItemList:
+    """List of items below the text input field drawn to available space,
+    only the visible rows are laid out, their labels are reused on scrolling"""
+
+    def __init__(self, font_height, batch, groups):
+        self.font_height = font_height
+        self.margin = font_height * conf.TEXT_INPUT_MARGIN
+        self.line_height = self.font_height + 2 * self.margin
+        self.batch = batch
+        self.group = groups[2]
+        # create background rectangle
+        self.rect = Rectangle(
+            0,
+            0,
+            100,
+            self.line_height,
+            color=conf.ITEM_LIST_COLOR,
+            batch=batch,
+            group=groups[0],
+        )
+        # create select rectangle
+        self.select_rect = Rectangle(
+            0,
+            0,
+            100,
+            self.line_height,
+            color=conf.ITEM_SELECT_COLOR,
+            batch=batch,
+            group=groups[1],
+        )
+        self.select_rect.visible = False
+        # initialze member variables
+        self.labels = []
+        # full text shown by each label, it might be shortened to fit
+        self.texts = []
+        self.select_num = -1
+        self.top = 0
+        self.scroll_rest = 0
+        self.items = []
+        self.x = 0
+        self.y = 0
+        self.w = 0
+        self.text_w = 0
+
+    def resize(self, x, y, w, max_h):
+        """Resize the list content to given coordinates, width and
+        maximum height"""
+        self.x = x
+        self.y = y
+        self.w = w
+        self.rect.x = x
+        self.rect.width = w
+        self.select_rect.x = x
+        self.select_rect.width = w
+        self.text_w = w - 2 * self.margin
+        # create or delete labels to fill the available height
+        rows = max(0, int(max_h // self.line_height))
+        while len(self.labels) > rows:
+            self.labels.pop().delete()
+        while len(self.labels) < rows:
+            self.labels.append(
+                Label(
+                    "",
+                    font_name=conf.FONT_NAME,
+                    font_size=conf.FONT_SIZE,
+                    anchor_y="top",
+                    color=conf.ITEM_FONT_COLOR,
+                    batch=self.batch,
+                    group=self.group,
+                )
+            )
+        for i, label in enumerate(self.labels):
+            label.x = x + self.margin
+            label.y = y - self.margin - i * self.line_height
+        # fit all texts to the new width
+        self.texts = [None] * len(self.labels)
+        self.__show(self.top)
+
+    def contains(self, x, y):
+        """Test if a given coordinate is within the list"""
+        return (
+            self.x <= x <= self.x + self.w
+            and self.y - self.rect.height <= y <= self.y
+        )
+
+    def select(self, num=-1):
+        """Select an item via list index, scroll to it if necessary"""
+        if num < 0:
+            self.select_num = -1
+        elif num < len(self.items):
+            self.select_num = num
+            if num < self.top:
+                self.__show(num)
+            elif num >= self.top + len(self.labels):
+                self.__show(num - len(self.labels) + 1)
+        self.__move_select()
+
+    def scroll(self, lines):
+        """Scroll the list by a given amount of lines"""
+        self.scroll_rest += lines
+        steps = int(self.scroll_rest)
+        self.scroll_rest -= steps
+        if steps != 0:
+            self.__show(self.top + steps)
+
+    def get_selected(self):
+        """Return index of the selected item, -1 if no item is selected"""
+        return self.select_num
+
+    def set_items(self, items=[]):
+        """Set list content to a given list of items, keep the scroll position
+        and the selection if it is still within the list, scroll to it"""
+        self.items = items
+        self.select_num = min(self.select_num, len(items) - 1)
+        self.__show(self.top)
+        self.select(self.select_num)
+
+    @profiling.profile("ItemList.show")
+    def __show(self, top):
+        """Show the items starting at a given list index"""
+        self.top = max(0, min(top, len(self.items) - len(self.labels)))
+        visible = self.items[self.top : self.top + len(self.labels)]
+        for i, label in enumerate(self.labels):
+            text = visible[i].name if i < len(visible) else ""
+            if self.texts[i] != text:
+                self.texts[i] = text
+                self.__fit(label, text)
+        h = self.line_height * len(visible)
+        self.rect.height = h
+        self.rect.y = self.y - h
+        self.__move_select()
+
+    def __fit(self, label, text):
+        """Set the text of a label, shorten it with an ellipsis if it is wider
+        than the list"""
+        label.text = text
+        if label.content_width > self.text_w:
+            # longest prefix fitting together with the ellipsis
+            low, high = 0, len(text) - 1
+            while low < high:
+                mid = (low + high + 1) // 2
+                label.text = text[:mid] + "\u2026"
+                if label.content_width <= self.text_w:
+                    low = mid
+                else:
+                    high = mid - 1
+            label.text = text[:low].rstrip() + "\u2026"
+
+    def __move_select(self):
+        """Move the select rectangle to the selected item if it is visible"""
+        row = self.select_num - self.top
+        visible = self.select_num >= 0 and 0 <= row < len(self.labels)
+        self.select_rect.visible = visible
+        self.select_rect.y = self.y - self.line_height * (1 + row)
+
+
+class Caret(caret.Caret):
+    """Custom caret to handle specific events with callbacks"""
+
+    def __init__(
+        self,
+        input,
+        color,
+        on_click,
+        on_enter,
+        on_motion,
+        on_search,
+        on_scroll,
+        on_blink,
+    ):
+        self.on_blink = on_blink
+        super().__init__(input, color=color)
+        self.prev_x = 0
+        self.prev_y = 0
+        self.document = input.document
+        self.on_click = on_click
+        self.on_enter = on_enter
+        self.on_motion = on_motion
+        self.on_search = on_search
+        self.on_scroll = on_scroll
+
+    def _blink(self, dt):
+        """Toggle caret visibility, window needs to be redrawn to show it"""
+        super()._blink(dt)
+        self.on_blink()
+
+    def on_mouse_press(self, x, y, button, modifiers):
+        """Handle mouse press"""
+        if x != self.prev_x and y != self.prev_y:
+            self.prev_x = x
+            self.prev_y = y
+            self.on_click(x, y)
+
+    def on_mouse_scroll(self, x, y, scroll_x, scroll_y):
+        """Handle mouse scroll"""
+        self.on_scroll(x, y, scroll_y)
+        return super().on_mouse_scroll(x, y, scroll_x, scroll_y)
+
+    def on_text(self, text):
+        """Handle text input by detecting enter/return events"""
+        if text == conf.CHAR_ENTER:
+            self.on_enter()
+        else:
+            super().on_text(text)
+            self.on_search(self.document.text)
+        return event.EVENT_HANDLED
+
+    def on_text_motion(self, motion, select=False):
+        """Handle motion input events"""
+        super().on_text_motion(motion, select)
+        self.on_motion(motion)
+        self.on_search(self.document.text)
+        return event.EVENT_HANDLED